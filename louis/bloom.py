@@ -0,0 +1,70 @@
+"""Bloom filter for Louis crawler.
+
+A Bloom filter answers "have I seen this key?" in constant memory per key.
+It never gives a false negative, and gives a false positive with a
+probability bounded by the error rate it was sized for.
+"""
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over str or bytes keys.
+
+    Bit positions are derived from a single blake2b digest by double
+    hashing, so each operation costs one hash regardless of the number
+    of hash functions.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        """Create a filter sized for capacity keys at the given error rate.
+
+        Args:
+            capacity: Expected number of keys
+            error_rate: Acceptable false positive probability once the
+                filter holds capacity keys
+        """
+        capacity = max(1, capacity)
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key):
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """Add a key to the filter.
+
+        Returns:
+            bool: True if the key was not already (probably) present
+        """
+        added = False
+        bits = self._bits
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    def __len__(self):
+        """Number of distinct keys added, as far as the filter can tell."""
+        return self.count
@@ -12,6 +12,13 @@ import louis.db as db
 class LouisPipeline:
     """Pipeline for storing items in the database"""
 
+    # Crawl items are buffered and written with one COPY per batch
+    batch_size = 1000
+
+    def __init__(self):
+        self.connection = None
+        self.crawl_items = []
+
     def open_spider(self, spider):
         """open connection to the database"""
         try:
@@ -24,10 +31,40 @@ class LouisPipeline:
 
     def close_spider(self, spider):
         """close connection to database"""
+        self.flush_crawl_items()
         if self.connection:
             self.connection.close()
             print(f"✅ Pipeline: Database connection closed")
 
+    def flush_crawl_items(self):
+        """bulk store buffered crawl items, retrying one by one on failure"""
+        if not self.crawl_items:
+            return
+        items, self.crawl_items = self.crawl_items, []
+        try:
+            count = db.store_crawl_items_to_database(self.connection, items)
+            print(f"✅ Stored batch of {count} items")
+        except Exception as e:
+            print(f"⚠️  Batch storage error: {e}")
+            # One bad row fails the whole COPY; only the rows that fail on
+            # their own go to disk
+            for item in items:
+                self.store_crawl_item_or_disk(item)
+
+    def store_crawl_item_or_disk(self, item):
+        """store one crawl item in its own transaction, else to disk"""
+        try:
+            with self.connection.transaction(), db.cursor(self.connection) as cursor:
+                db.store_crawl_item_to_database(cursor, item)
+            print(f"✅ Stored item: {item.get('url', 'unknown')}")
+        except Exception as e:
+            print(f"⚠️  Storage error: {e}")
+            try:
+                db.store_to_disk(item)
+                print(f"📁 Stored to disk: {item.get('url', 'unknown')}")
+            except Exception as disk_error:
+                print(f"❌ Disk storage also failed: {disk_error}")
+
     def process_item(self, item, spider):
         """process item and store in database"""
         if spider.name in [
@@ -36,6 +73,11 @@ class LouisPipeline:
             "goldie_playwright",
             "goldie_playwright_parallel",
         ]:
+            if self.connection is not None and db.get_storage_mode() == 'database':
+                self.crawl_items.append(item)
+                if len(self.crawl_items) >= self.batch_size:
+                    self.flush_crawl_items()
+                return item
             try:
                 with db.cursor(self.connection) as cursor:
                     result = db.store_crawl_item(cursor, item)
@@ -5,11 +5,14 @@ Playwright-enabled version of the goldie spider for JavaScript-rendered content.
 import re
 import time
 import os
+import hashlib
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
 from louis.crawler.spiders.base_playwright import (
     PlaywrightSpider,
     SmartPlaywrightSpider,
 )
+from louis.bloom import BloomFilter
 from louis.crawler.items import CrawlItem
 from louis.crawler.requests import extract_urls, fix_vhost
 
@@ -54,12 +57,17 @@ class GoldiePlaywrightSpider(PlaywrightSpider):
     playwright_timeout = 30000
     playwright_wait_time = 3  # Wait 3 seconds for any final JS execution
 
+    # False positive rate of the scraped URL filter; 7 hash functions
+    scraped_urls_error_rate = 1 / 128
+
     def __init__(
         self,
         max_depth=1,
         scraped_urls_file=None,
         pending_urls_file=None,
         errored_urls_file=None,
+        max_urls=1_000_000,
+        lazy=False,
         *args,
         **kwargs,
     ):
@@ -71,19 +79,31 @@ class GoldiePlaywrightSpider(PlaywrightSpider):
             scraped_urls_file (str): File to store scraped URLs to avoid duplicates
             pending_urls_file (str): File to store pending URLs for resuming interrupted scraping
             errored_urls_file (str): File to store URLs that resulted in errors
+            max_urls (int): Expected number of scraped URLs, used to size the
+                Bloom filter that tracks them
+            lazy (bool): Defer loading scraped_urls_file until a URL is first
+                checked or saved
         """
         super().__init__(*args, **kwargs)
         self.max_depth = int(max_depth)
+        self.max_urls = int(max_urls)
         
         # Generate timestamped filenames if not provided
         self.scraped_urls_file = scraped_urls_file or generate_timestamped_filename("logs/scraped_urls")
         self.pending_urls_file = pending_urls_file or generate_timestamped_filename("logs/pending_urls")
         self.errored_urls_file = errored_urls_file or generate_timestamped_filename("logs/errored_urls")
         
-        self.scraped_urls = set()
+        # Bloom filter rather than a set: about 10 bits per URL, at the cost
+        # of a small chance (scraped_urls_error_rate) that a new URL is
+        # reported as already scraped
+        self.scraped_urls = self._new_scraped_urls_filter()
         self.pending_urls = set()
         self.errored_urls = set()
-        self._load_scraped_urls()
+        # Opened on first save and kept open until the spider closes
+        self._scraped_urls_fp = None
+        self._scraped_urls_loaded = False
+        if str(lazy).lower() not in ("true", "1", "yes"):
+            self._ensure_scraped_urls_loaded()
         self._load_pending_urls()
         self._load_errored_urls()
 
@@ -91,22 +111,103 @@ class GoldiePlaywrightSpider(PlaywrightSpider):
         self.logger.info(
             f"scraped_urls_file={self.scraped_urls_file}, pending_urls_file={self.pending_urls_file}, errored_urls_file={self.errored_urls_file}"
         )
-        self.logger.info(f"Already scraped URLs loaded: {len(self.scraped_urls)}")
+        if self._scraped_urls_loaded:
+            self.logger.info(f"Already scraped URLs loaded: {len(self.scraped_urls)}")
+        else:
+            self.logger.info("Scraped URLs will be loaded on first use")
         self.logger.info(f"Pending URLs loaded: {len(self.pending_urls)}")
         self.logger.info(f"Errored URLs loaded: {len(self.errored_urls)}")
 
+    @staticmethod
+    def _normalize(url):
+        """Normalize a URL so trivial variants are tracked as one page.
+
+        Drops the fragment, collapses repeated slashes in the path and
+        strips the trailing slash, so /en/food, /en/food/ and /en//food#top
+        are the same page.
+        """
+        parts = urlsplit(url)
+        path = re.sub(r"/+", "/", parts.path).rstrip("/") or "/"
+        return urlunsplit((parts.scheme, parts.netloc, path, parts.query, ""))
+
+    @classmethod
+    def _url_key(cls, url):
+        """Return the fixed-width 16-byte digest used to track a URL."""
+        return hashlib.blake2b(
+            cls._normalize(url).encode("utf-8"), digest_size=16
+        ).digest()
+
+    def _new_scraped_urls_filter(self):
+        """Create an empty filter for scraped URLs."""
+        return BloomFilter(self.max_urls, error_rate=self.scraped_urls_error_rate)
+
+    def _parse_scraped_urls(self, data):
+        """Return the URL digests recorded in the contents of a scraped URLs file.
+
+        Files written by this spider are fixed-width records of 32 hex digits
+        and a newline, decoded in one pass. Files written before digests were
+        used hold the URLs themselves, one per line, and are hashed here.
+        """
+        if len(data) % 33 == 0:
+            try:
+                raw = bytes.fromhex(data.replace(b"\n", b"").decode("ascii"))
+            except ValueError:
+                pass
+            else:
+                return [raw[i:i + 16] for i in range(0, len(raw), 16)]
+
+        keys = []
+        for line in data.decode("utf-8", "replace").split():
+            key = None
+            if len(line) == 32:
+                try:
+                    key = bytes.fromhex(line)
+                except ValueError:
+                    pass
+            keys.append(key or self._url_key(line))
+        return keys
+
+    def _ensure_scraped_urls_loaded(self):
+        """Load scraped_urls_file the first time the scraped URLs are needed."""
+        if not self._scraped_urls_loaded:
+            self._scraped_urls_loaded = True
+            self._load_scraped_urls()
+
+    @property
+    def scraped_urls_count(self):
+        """Number of scraped URLs.
+
+        Before the URL file has been loaded this counts its lines rather
+        than parsing them, reading the file in fixed-size chunks.
+        """
+        if self._scraped_urls_loaded:
+            return len(self.scraped_urls)
+        count = 0
+        last = b"\n"
+        try:
+            with open(self.scraped_urls_file, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    count += chunk.count(b"\n")
+                    last = chunk[-1:]
+        except OSError:
+            return 0
+        # A last line without a trailing newline still counts
+        return count + (last != b"\n")
+
     def _load_scraped_urls(self):
         """Load previously scraped URLs from file."""
         if os.path.exists(self.scraped_urls_file):
             try:
-                with open(self.scraped_urls_file, "r", encoding="utf-8") as f:
-                    self.scraped_urls = set(line.strip() for line in f if line.strip())
+                with open(self.scraped_urls_file, "rb") as f:
+                    data = f.read()
+                for key in self._parse_scraped_urls(data):
+                    self.scraped_urls.add(key)
                 self.logger.info(
                     f"Loaded {len(self.scraped_urls)} URLs from {self.scraped_urls_file}"
                 )
             except Exception as e:
                 self.logger.error(f"Error loading scraped URLs: {e}")
-                self.scraped_urls = set()
+                self.scraped_urls = self._new_scraped_urls_filter()
         else:
             self.logger.info(
                 f"No existing scraped URLs file found: {self.scraped_urls_file}"
@@ -163,15 +264,33 @@ class GoldiePlaywrightSpider(PlaywrightSpider):
             )
 
     def _save_scraped_url(self, url):
-        """Save a newly scraped URL to file."""
-        if url not in self.scraped_urls:
-            self.scraped_urls.add(url)
+        """Save a newly scraped URL to file.
+
+        The file records the hex digest of each URL rather than the URL.
+        Writes go through a long-lived writer with a 1 MiB buffer, so they
+        reach the file when the buffer fills or the spider closes.
+        """
+        self._ensure_scraped_urls_loaded()
+        key = self._url_key(url)
+        if self.scraped_urls.add(key):
             try:
-                with open(self.scraped_urls_file, "a", encoding="utf-8") as f:
-                    f.write(f"{url}\n")
+                if self._scraped_urls_fp is None:
+                    self._scraped_urls_fp = open(
+                        self.scraped_urls_file, "a", encoding="utf-8", buffering=1 << 20
+                    )
+                self._scraped_urls_fp.write(f"{key.hex()}\n")
             except Exception as e:
                 self.logger.error(f"Error saving scraped URL: {e}")
 
+    def _close_scraped_urls_file(self):
+        """Flush and close the scraped URLs file if it is open."""
+        if self._scraped_urls_fp is not None:
+            try:
+                self._scraped_urls_fp.close()
+            except Exception as e:
+                self.logger.error(f"Error closing scraped URLs file: {e}")
+            self._scraped_urls_fp = None
+
     def _save_errored_url(self, url):
         """Save a newly errored URL to file."""
         if url not in self.errored_urls:
@@ -184,7 +303,7 @@ class GoldiePlaywrightSpider(PlaywrightSpider):
 
     def _add_pending_url(self, url, depth):
         """Add a URL to pending queue."""
-        if url not in self.scraped_urls and url not in self.errored_urls:
+        if not self._is_url_scraped(url) and url not in self.errored_urls:
             url_depth_tuple = (url, depth)
             if url_depth_tuple not in self.pending_urls:
                 self.pending_urls.add(url_depth_tuple)
@@ -215,7 +334,8 @@ class GoldiePlaywrightSpider(PlaywrightSpider):
 
     def _is_url_scraped(self, url):
         """Check if URL has already been scraped."""
-        return url in self.scraped_urls
+        self._ensure_scraped_urls_loaded()
+        return self._url_key(url) in self.scraped_urls
 
     def _get_request_depth(self, response):
         """Get the current depth of a request."""
@@ -372,7 +492,8 @@ class GoldiePlaywrightSpider(PlaywrightSpider):
     def closed(self, reason):
         """Called when the spider is closed."""
         self.logger.info(f"Spider closed: {reason}")
-        self.logger.info(f"Total URLs scraped: {len(self.scraped_urls)}")
+        self._close_scraped_urls_file()
+        self.logger.info(f"Total URLs scraped: {self.scraped_urls_count}")
         self.logger.info(f"Total URLs errored: {len(self.errored_urls)}")
         self.logger.info(f"Pending URLs remaining: {len(self.pending_urls)}")
 
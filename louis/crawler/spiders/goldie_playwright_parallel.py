@@ -9,7 +9,7 @@ import os
 import signal
 import multiprocessing as mp
 from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import List, Set, Tuple, Dict, Any
+from typing import List, Set, Tuple, Dict, Any, Optional
 import logging
 import queue
 from datetime import datetime
@@ -312,12 +312,28 @@ def generate_timestamped_filename(base_name: str, extension: str = "log") -> str
         return f"{base_name}_{timestamp}"
 
 
+# Pipeline configurations already resolved, keyed by the raw STORAGE_MODE value
+_MODE_CACHE: Dict[Optional[str], Dict[str, int]] = {}
+
+
 def get_pipeline_config_for_storage_mode():
     """Get the appropriate pipeline configuration based on STORAGE_MODE environment variable.
     
+    The configuration is resolved once per distinct STORAGE_MODE value.
+    
     Returns:
         dict: Pipeline configuration dictionary
     """
+    raw_mode = db._read_storage_mode()
+    config = _MODE_CACHE.get(raw_mode)
+    if config is None:
+        config = _MODE_CACHE[raw_mode] = _resolve_pipeline_config()
+    # Callers may modify the settings they are given
+    return dict(config)
+
+
+def _resolve_pipeline_config():
+    """Build the pipeline configuration for the current storage mode."""
     storage_mode = db.get_storage_mode()
     
     if storage_mode == 'database':
@@ -9,10 +9,13 @@ import os
 import json
 import uuid
 import io
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from functools import lru_cache
 from urllib.parse import urlencode, urlparse, parse_qs
 from pathlib import Path
 
+
 # Make psycopg import optional for disk-only storage
 try:
     import psycopg
@@ -22,6 +25,14 @@ except ImportError:
     PSYCOPG_AVAILABLE = False
     print("Warning: psycopg not available. Database storage disabled.")
 
+# Make orjson optional; the standard library parser is used without it
+try:
+    from orjson import loads as json_loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    from json import loads as json_loads
+    ORJSON_AVAILABLE = False
+
 # Make MinIO import optional for non-S3 storage
 try:
     from minio import Minio
@@ -38,7 +49,23 @@ def get_storage_mode():
     Returns:
         str: 'database', 'disk', or 's3'
     """
-    mode = os.getenv('STORAGE_MODE', 'database').lower()
+    value = _read_storage_mode()
+    return _resolve_storage_mode('database' if value is None else value)
+
+
+def _read_storage_mode():
+    """Read the raw STORAGE_MODE value, or None when it is unset."""
+    return os.environ.get('STORAGE_MODE')
+
+
+@lru_cache(maxsize=8)
+def _resolve_storage_mode(value):
+    """Validate a STORAGE_MODE value, memoized per raw value.
+    
+    Keying the cache on the environment value keeps the result correct
+    if STORAGE_MODE changes at runtime, as it does in the tests.
+    """
+    mode = value.lower()
     
     # Validate and fallback for unavailable dependencies
     if mode == 'database' and not PSYCOPG_AVAILABLE:
@@ -63,7 +90,12 @@ def get_storage_directory():
     Returns:
         Path: Path object for the storage directory
     """
-    storage_dir = os.getenv('STORAGE_DIRECTORY', 'storage')
+    return _storage_path(os.getenv('STORAGE_DIRECTORY', 'storage'))
+
+
+@lru_cache(maxsize=8)
+def _storage_path(storage_dir):
+    """Build the storage Path, memoized per STORAGE_DIRECTORY value."""
     return Path(storage_dir)
 
 
@@ -138,6 +170,9 @@ def store_to_disk(item):
     """
     html_dir, metadata_dir = ensure_storage_directories()
     
+    # Checked before writing, as the new metadata file updates the directory
+    index_current = _disk_index_is_current(metadata_dir)
+    
     # Generate UUID for filenames
     file_uuid = str(uuid.uuid4())
     
@@ -164,6 +199,12 @@ def store_to_disk(item):
     with open(metadata_file_path, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, indent=2, ensure_ascii=False)
     
+    if index_current:
+        append_to_disk_index(metadata)
+    else:
+        # Appending to a missing or stale index would hide the items it lacks
+        rebuild_disk_index()
+    
     # Add file paths to metadata
     metadata['html_file_path'] = str(html_file_path)
     metadata['metadata_file_path'] = str(metadata_file_path)
@@ -203,25 +244,172 @@ def load_from_disk(file_uuid):
     return result
 
 
-def list_stored_items():
-    """List all stored items on disk.
+def load_metadata_from_disk(file_uuid):
+    """Load a CrawlItem's metadata from disk without reading its HTML.
     
+    Args:
+        file_uuid: UUID string for the files
+        
     Returns:
-        list: List of metadata dictionaries for all stored items
+        dict: The item metadata with file paths and html_size (in bytes),
+              or None if not found
     """
     html_dir, metadata_dir = ensure_storage_directories()
     
-    items = []
-    for metadata_file in metadata_dir.glob('*.json'):
-        try:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-                items.append(metadata)
-        except (json.JSONDecodeError, IOError):
-            # Skip corrupted files
-            continue
+    metadata_file_path = metadata_dir / f"{file_uuid}.json"
+    html_file_path = html_dir / f"{file_uuid}.html"
     
-    return sorted(items, key=lambda x: x.get('last_crawled', 0), reverse=True)
+    try:
+        html_size = os.stat(html_file_path).st_size
+        with open(metadata_file_path, 'rb') as f:
+            metadata = json_loads(f.read())
+    except FileNotFoundError:
+        return None
+    
+    metadata['html_file_path'] = str(html_file_path)
+    metadata['metadata_file_path'] = str(metadata_file_path)
+    metadata['html_size'] = html_size
+    
+    return metadata
+
+
+# Fields kept for each item in the disk index
+DISK_INDEX_FIELDS = ('id', 'url', 'title', 'lang', 'last_crawled',
+                     'html_file', 'metadata_file')
+
+
+def get_disk_index_path():
+    """Get the path of the disk storage index.
+    
+    Returns:
+        Path: Path of the index.jsonl file in the storage directory
+    """
+    return get_storage_directory() / 'index.jsonl'
+
+
+def _disk_index_is_current(metadata_dir):
+    """Check that the disk index exists and is not older than the metadata files."""
+    try:
+        index_mtime = get_disk_index_path().stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return index_mtime >= metadata_dir.stat().st_mtime_ns
+
+
+def _disk_index_entry(metadata):
+    """Build the disk index entry for an item's metadata.
+    
+    Casefolded url and title are stored as url_cf and title_cf so searches
+    don't have to casefold every entry.
+    """
+    entry = {field: metadata.get(field) for field in DISK_INDEX_FIELDS}
+    entry['url_cf'] = (entry['url'] or '').casefold()
+    entry['title_cf'] = (entry['title'] or '').casefold()
+    return entry
+
+
+def _disk_index_line(entry):
+    """Serialize a disk index entry as one JSON line."""
+    return json.dumps(entry, ensure_ascii=False) + '\n'
+
+
+def append_to_disk_index(metadata):
+    """Append an item to the disk index.
+    
+    Args:
+        metadata: Metadata dictionary as written by store_to_disk
+    """
+    with open(get_disk_index_path(), 'a', encoding='utf-8') as f:
+        f.write(_disk_index_line(_disk_index_entry(metadata)))
+
+
+def _read_disk_index_entry(metadata_file_path):
+    """Read a metadata file into a disk index entry, or None if unreadable."""
+    try:
+        with open(metadata_file_path, 'rb') as f:
+            return _disk_index_entry(json_loads(f.read()))
+    except (ValueError, OSError):
+        # Skip corrupted files
+        return None
+
+
+def rebuild_disk_index():
+    """Rebuild the disk index from the metadata files.
+    
+    Returns:
+        list: List of index entries for all stored items
+    """
+    html_dir, metadata_dir = ensure_storage_directories()
+    
+    with os.scandir(metadata_dir) as it:
+        paths = [entry.path for entry in it if entry.name.endswith('.json')]
+    
+    # Reads are I/O-bound, so overlap them on a thread pool
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        entries = [
+            entry for entry in executor.map(_read_disk_index_entry, paths)
+            if entry is not None
+        ]
+    
+    # Write to a temporary file first so readers never see a partial index
+    index_path = get_disk_index_path()
+    tmp_path = index_path.with_suffix('.jsonl.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.writelines(_disk_index_line(entry) for entry in entries)
+    os.replace(tmp_path, index_path)
+    
+    return entries
+
+
+# Parsed disk index per index path, keyed by the index file's mtime and size
+_stored_items_cache = {}
+
+
+def _load_disk_index():
+    """Load the disk index, using the cached copy while it is current.
+    
+    The index is rebuilt from the metadata files when it is missing or
+    older than the metadata directory.
+    
+    Returns:
+        tuple: (stamp, items) where stamp identifies the index file version
+               and items is the cached list, which must not be mutated
+    """
+    html_dir, metadata_dir = ensure_storage_directories()
+    index_path = get_disk_index_path()
+    
+    items = None
+    if not _disk_index_is_current(metadata_dir):
+        items = rebuild_disk_index()
+    index_stat = index_path.stat()
+    
+    stamp = (index_stat.st_mtime_ns, index_stat.st_size)
+    cached = _stored_items_cache.get(index_path)
+    if items is None and cached is not None and cached[0] == stamp:
+        return cached
+    
+    if items is None:
+        with open(index_path, 'rb') as f:
+            items = [json_loads(line) for line in f if line.strip()]
+    
+    items.sort(key=lambda x: x.get('last_crawled') or 0, reverse=True)
+    _stored_items_cache[index_path] = (stamp, items)
+    return stamp, items
+
+
+def list_stored_items():
+    """List all stored items on disk.
+    
+    Items are read from the disk index, which is rebuilt from the metadata
+    files when it is missing or older than the metadata directory. The
+    parsed index is cached until the index file changes.
+    
+    Returns:
+        list: List of index entries (id, url, title, lang, last_crawled,
+              html_file, metadata_file, url_cf, title_cf) for all stored items
+    """
+    stamp, items = _load_disk_index()
+    return list(items)
 
 
 def store_to_s3(item):
@@ -398,17 +586,23 @@ def connect_db():
 
 
 @contextmanager
-def cursor(connection):
+def cursor(connection, name=None):
     """Context manager for database cursors.
     
     Args:
         connection: Database connection object
+        name: Optional name; when given a server-side cursor is opened so
+            results are streamed from the server instead of fetched at once
         
     Yields:
         psycopg.Cursor: Database cursor
     """
-    with connection.cursor() as cur:
-        yield cur
+    if name:
+        with connection.cursor(name=name) as cur:
+            yield cur
+    else:
+        with connection.cursor() as cur:
+            yield cur
 
 
 def create_tables(connection):
@@ -488,9 +682,90 @@ def create_tables(connection):
         cur.execute("CREATE INDEX IF NOT EXISTS idx_page_links_source ON page_links(source_url)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_page_links_dest ON page_links(destination_url)")
         
+        # Trigram index so url/title ILIKE '%...%' searches avoid a sequential scan.
+        # Creating the extension needs privileges the role may not have, so it
+        # runs in a savepoint and the rest of the schema is kept without it
+        try:
+            with connection.transaction():
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except psycopg.Error as e:
+            print(f"Warning: pg_trgm extension not available, skipping trigram index: {e}")
+        else:
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_crawl_items_trgm ON crawl_items
+                USING gin (url gin_trgm_ops, title gin_trgm_ops)
+            """)
+        
         connection.commit()
 
 
+# Hot-path statements are kept as module constants and executed with
+# prepare=True so the server parses and plans each of them once per connection
+_INSERT_CRAWL_SQL = """
+    INSERT INTO crawl_items (url, title, lang, html_content, last_crawled, last_updated, children)
+    VALUES (%(url)s, %(title)s, %(lang)s, %(html_content)s, %(last_crawled)s, %(last_updated)s, %(children)s)
+    ON CONFLICT (url) DO UPDATE SET
+        title = EXCLUDED.title,
+        lang = EXCLUDED.lang,
+        html_content = EXCLUDED.html_content,
+        last_crawled = EXCLUDED.last_crawled,
+        last_updated = EXCLUDED.last_updated,
+        children = EXCLUDED.children
+"""
+
+# Only the generated id is sent back; echoing the whole row would ship
+# html_content, tokens or embeddings back over the wire for nothing
+_INSERT_CRAWL_RETURNING_ID_SQL = _INSERT_CRAWL_SQL + "RETURNING id\n"
+
+_INSERT_CHUNK_SQL = """
+    INSERT INTO chunk_items (url, title, text_content, token_count, tokens)
+    VALUES (%(url)s, %(title)s, %(text_content)s, %(token_count)s, %(tokens)s)
+    RETURNING id
+"""
+
+_INSERT_EMBEDDING_SQL = """
+    INSERT INTO embedding_items (token_id, embedding, embedding_model)
+    VALUES (%(token_id)s, %(embedding)s, %(embedding_model)s)
+    RETURNING id
+"""
+
+_LINK_PAGES_SQL = """
+    INSERT INTO page_links (source_url, destination_url)
+    VALUES (%s, %s)
+    ON CONFLICT (source_url, destination_url) DO NOTHING
+"""
+
+
+def _crawl_item_params(item):
+    """Build the INSERT parameters for a CrawlItem."""
+    return {
+        'url': item.get('url'),
+        'title': item.get('title'),
+        'lang': item.get('lang'),
+        'html_content': item.get('html_content'),
+        'last_crawled': item.get('last_crawled'),
+        'last_updated': item.get('last_updated'),
+        'children': json.dumps(item.get('children', []))  # Convert list to JSON
+    }
+
+
+def store_crawl_item_returning_id(cur, item):
+    """Store a CrawlItem in the database and return its id.
+    
+    Args:
+        cur: Database cursor
+        item: CrawlItem object with fields: url, title, lang, html_content, 
+              last_crawled, last_updated, children
+              
+    Returns:
+        UUID: The id of the inserted or updated row
+    """
+    # Use INSERT ... ON CONFLICT to handle duplicates
+    cur.execute(_INSERT_CRAWL_RETURNING_ID_SQL, _crawl_item_params(item),
+                prepare=True)
+    return cur.fetchone()['id']
+
+
 def store_crawl_item_to_database(cur, item):
     """Store a CrawlItem in the database.
     
@@ -500,32 +775,85 @@ def store_crawl_item_to_database(cur, item):
               last_crawled, last_updated, children
               
     Returns:
-        dict: The stored item with generated id
+        dict: The stored item metadata (without html_content) with generated id
     """
-    # Use INSERT ... ON CONFLICT to handle duplicates
-    cur.execute("""
-        INSERT INTO crawl_items (url, title, lang, html_content, last_crawled, last_updated, children)
-        VALUES (%(url)s, %(title)s, %(lang)s, %(html_content)s, %(last_crawled)s, %(last_updated)s, %(children)s)
-        ON CONFLICT (url) DO UPDATE SET
-            title = EXCLUDED.title,
-            lang = EXCLUDED.lang,
-            html_content = EXCLUDED.html_content,
-            last_crawled = EXCLUDED.last_crawled,
-            last_updated = EXCLUDED.last_updated,
-            children = EXCLUDED.children
-        RETURNING *
-    """, {
+    return {
+        'id': store_crawl_item_returning_id(cur, item),
         'url': item.get('url'),
         'title': item.get('title'),
         'lang': item.get('lang'),
-        'html_content': item.get('html_content'),
         'last_crawled': item.get('last_crawled'),
         'last_updated': item.get('last_updated'),
-        'children': json.dumps(item.get('children', []))  # Convert list to JSON
-    })
-    
-    result = cur.fetchone()
-    return result
+        'children': item.get('children', []),
+    }
+
+
+def store_crawl_items_to_database(connection, items):
+    """Bulk store CrawlItems in the database in a single transaction.
+
+    Rows are streamed with COPY into a session-local staging table and then
+    upserted into crawl_items with one INSERT ... SELECT, so a whole batch
+    costs one statement and one commit instead of one of each per item.
+    Use store_crawl_item_to_database for single items.
+
+    Args:
+        connection: Database connection object
+        items: Iterable of CrawlItem objects with fields: url, title, lang,
+               html_content, last_crawled, last_updated, children
+
+    Returns:
+        int: Number of rows written
+    """
+    # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement,
+    # so keep only the most recent item for each URL
+    by_url = {item.get('url'): item for item in items}
+    if not by_url:
+        return 0
+
+    with connection.transaction():
+        with cursor(connection) as cur:
+            cur.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS crawl_items_staging (
+                    url TEXT,
+                    title TEXT,
+                    lang VARCHAR(2),
+                    html_content TEXT,
+                    last_crawled DOUBLE PRECISION,
+                    last_updated TEXT,
+                    children JSONB
+                )
+            """)
+            with cur.copy("""
+                COPY crawl_items_staging
+                    (url, title, lang, html_content, last_crawled, last_updated, children)
+                FROM STDIN
+            """) as copy:
+                for url, item in by_url.items():
+                    copy.write_row((
+                        url,
+                        item.get('title'),
+                        item.get('lang'),
+                        item.get('html_content'),
+                        item.get('last_crawled'),
+                        item.get('last_updated'),
+                        json.dumps(item.get('children', [])),
+                    ))
+            cur.execute("""
+                INSERT INTO crawl_items (url, title, lang, html_content, last_crawled, last_updated, children)
+                SELECT url, title, lang, html_content, last_crawled::integer, last_updated, children
+                FROM crawl_items_staging
+                ON CONFLICT (url) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    lang = EXCLUDED.lang,
+                    html_content = EXCLUDED.html_content,
+                    last_crawled = EXCLUDED.last_crawled,
+                    last_updated = EXCLUDED.last_updated,
+                    children = EXCLUDED.children
+            """)
+            count = cur.rowcount
+            cur.execute("TRUNCATE crawl_items_staging")
+
+    return count
 
 
 def store_crawl_item(cur, item):
@@ -575,19 +903,15 @@ def store_chunk_item(cur, item):
               token_count, tokens
               
     Returns:
-        dict: The stored item with generated id
+        dict: Row with the generated id
     """
-    cur.execute("""
-        INSERT INTO chunk_items (url, title, text_content, token_count, tokens)
-        VALUES (%(url)s, %(title)s, %(text_content)s, %(token_count)s, %(tokens)s)
-        RETURNING *
-    """, {
+    cur.execute(_INSERT_CHUNK_SQL, {
         'url': item['url'],
         'title': item['title'],
         'text_content': item['text_content'],
         'token_count': item['token_count'],
         'tokens': json.dumps(item['tokens'])  # Convert list to JSON
-    })
+    }, prepare=True)
     
     result = cur.fetchone()
     return result
@@ -601,17 +925,13 @@ def store_embedding_item(cur, item):
         item: EmbeddingItem object with fields: token_id, embedding, embedding_model
         
     Returns:
-        dict: The stored item with generated id
+        dict: Row with the generated id
     """
-    cur.execute("""
-        INSERT INTO embedding_items (token_id, embedding, embedding_model)
-        VALUES (%(token_id)s, %(embedding)s, %(embedding_model)s)
-        RETURNING *
-    """, {
+    cur.execute(_INSERT_EMBEDDING_SQL, {
         'token_id': item['token_id'],
         'embedding': item['embedding'],  # PostgreSQL can handle Python lists as arrays
         'embedding_model': item['embedding_model']
-    })
+    }, prepare=True)
     
     result = cur.fetchone()
     return result
@@ -676,11 +996,7 @@ def link_pages(cur, source_url, destination_url):
         source_url: Source page URL
         destination_url: Destination page URL
     """
-    cur.execute("""
-        INSERT INTO page_links (source_url, destination_url)
-        VALUES (%s, %s)
-        ON CONFLICT (source_url, destination_url) DO NOTHING
-    """, (source_url, destination_url))
+    cur.execute(_LINK_PAGES_SQL, (source_url, destination_url), prepare=True)
 
 
 def fetch_chunk_id_without_embedding(cur):
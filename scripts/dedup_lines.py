@@ -0,0 +1,43 @@
+import argparse
+from collections import Counter
+
+
+def count_lines(path):
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return Counter(line.rstrip('\n') for line in f)
+
+
+def dedup(path, *, blanks=True, counts=None):
+    """Return {line: count} for every line that appears more than once.
+
+    Blank lines are ignored when blanks is False. A Counter already built
+    with count_lines can be passed as counts to avoid reading the file again.
+    """
+    counts = count_lines(path) if counts is None else counts
+    return {
+        line: count for line, count in counts.items()
+        if count > 1 and (blanks or line.strip())
+    }
+
+
+def count_non_blank_lines(path, *, counts=None):
+    counts = count_lines(path) if counts is None else counts
+    return sum(count for line, count in counts.items() if line.strip())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Count duplicate lines in a file')
+    parser.add_argument('path', help='Text file to inspect')
+    parser.add_argument('--no-blanks', action='store_true',
+                        help='Ignore blank lines when reporting duplicates')
+    args = parser.parse_args()
+
+    counts = count_lines(args.path)
+    print(f"Number of non-blank lines: {count_non_blank_lines(args.path, counts=counts)}")
+    duplicates = dedup(args.path, blanks=not args.no_blanks, counts=counts)
+    if not duplicates:
+        print("No duplicate lines found.")
+    else:
+        print("Duplicate lines and their counts:")
+        for line, count in duplicates.items():
+            print(f"{repr(line)}: {count}")
@@ -1,61 +1,112 @@
-import os
+import argparse
 import json
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+
 from tqdm import tqdm
 
-# Set these variables as needed
-tld = 'storage-guidance-en'  # e.g. 'storage-guidance-fr'
-dest = 'storage-guidance-en-prune'  # e.g. 'storage-guidance-fr-prune'
-substring = '.ca/en'  # The substring to filter URLs
 
-src_metadata = os.path.join(tld, 'metadata')
-src_html = os.path.join(tld, 'html')
-dest_metadata = os.path.join(dest, 'metadata')
-dest_html = os.path.join(dest, 'html')
+def _metadata_files(src):
+    metadata_dir = os.path.join(src, 'metadata')
+    return [f for f in os.listdir(metadata_dir) if f.endswith('.json')]
+
+
+def _read_url(src, fname):
+    with open(os.path.join(src, 'metadata', fname), 'r', encoding='utf-8') as f:
+        return json.load(f).get('url', '')
 
-os.makedirs(dest_metadata, exist_ok=True)
-os.makedirs(dest_html, exist_ok=True)
 
-metadata_files = [f for f in os.listdir(src_metadata) if f.endswith('.json')]
+def _copy_pair(src, dest, fname):
+    """Copy one metadata/html pair; shutil uses os.sendfile on Linux."""
+    html_name = fname.replace('.json', '.html')
+    html_path = os.path.join(src, 'html', html_name)
+    if not os.path.exists(html_path):
+        raise FileNotFoundError(f"HTML file {html_name} not found for {fname}")
+    shutil.copy2(os.path.join(src, 'metadata', fname),
+                 os.path.join(dest, 'metadata', fname))
+    shutil.copy2(html_path, os.path.join(dest, 'html', html_name))
 
-pruned_list_path = os.path.join(os.getcwd(), 'pruned_list.txt')
-pruned_files = []
 
-for fname in tqdm(metadata_files, desc="Processing files"):
-    if not fname.endswith('.json'):
-        continue
-    json_path = os.path.join(src_metadata, fname)
-    with open(json_path, 'r', encoding='utf-8') as f:
+def prune(src, dest, substring, *, workers=32):
+    """Copy the items of src whose URL contains substring into dest.
+
+    Returns the metadata filenames that were left out.
+    """
+    os.makedirs(os.path.join(dest, 'metadata'), exist_ok=True)
+    os.makedirs(os.path.join(dest, 'html'), exist_ok=True)
+
+    def process(fname):
         try:
-            data = json.load(f)
+            url = _read_url(src, fname)
         except Exception as e:
             print(f"Error reading {fname}: {e}")
-            continue
-    url = data.get('url', '')
-    if substring in url:
-        # Copy JSON
-        shutil.copy2(json_path, os.path.join(dest_metadata, fname))
-        # Copy HTML
-        html_name = fname.replace('.json', '.html')
-        html_path = os.path.join(src_html, html_name)
-        if os.path.exists(html_path):
-            shutil.copy2(html_path, os.path.join(dest_html, html_name))
-        else:
-            print(f"Warning: HTML file {html_name} not found for {fname}")
-            raise FileNotFoundError(f"HTML file {html_name} not found for {fname}")
-    else:
-        pruned_files.append(fname)
+            return None
+        if substring in url:
+            _copy_pair(src, dest, fname)
+            return None
+        return fname
+
+    metadata_files = _metadata_files(src)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(tqdm(executor.map(process, metadata_files),
+                            total=len(metadata_files), desc="Processing files"))
+    return [fname for fname in results if fname is not None]
+
 
-# Write pruned filenames to pruned_list.txt
-with open(pruned_list_path, 'w', encoding='utf-8') as f:
-    for fname in pruned_files:
-        f.write(fname + '\n')
+def list_matching(src, substring, *, workers=32):
+    """Return the html/metadata paths of the items of src whose URL contains substring."""
+    def process(fname):
+        try:
+            return fname if substring in _read_url(src, fname) else None
+        except Exception as e:
+            print(f"Error processing {fname}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        matches = [f for f in executor.map(process, _metadata_files(src)) if f]
+    paths = []
+    for fname in matches:
+        paths.append(f"html/{fname.replace('.json', '.html')}")
+        paths.append(f"metadata/{fname}")
+    return paths
+
+
+def _write_lines(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(f"{line}\n" for line in lines)
 
-print(f"Pruned files list written to {pruned_list_path}")
-print(f"Done. Processed files with substring '{substring}' from {src_metadata} to {dest_metadata} and {dest_html}.")
 
-# Count files in source and destination
-src_count = len([f for f in os.listdir(src_metadata) if f.endswith('.json')])
-dest_count = len([f for f in os.listdir(dest_metadata) if f.endswith('.json')])
-print(f"Source metadata files: {src_count}")
-print(f"Destination metadata files: {dest_count}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Prune a disk storage directory by URL')
+    parser.add_argument('--workers', type=int, default=32, help='Number of I/O threads')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    copy_parser = subparsers.add_parser(
+        'copy', help='Copy items whose URL contains SUBSTRING into DEST')
+    copy_parser.add_argument('src', help='Source storage directory, e.g. storage-guidance-en')
+    copy_parser.add_argument('dest', help='Destination storage directory')
+    copy_parser.add_argument('--substring', default='.ca/en', help='URL substring to keep')
+    copy_parser.add_argument('--output', default='pruned_list.txt',
+                             help='File listing the metadata files left out')
+
+    list_parser = subparsers.add_parser(
+        'list', help='List the files of items whose URL contains SUBSTRING')
+    list_parser.add_argument('src', help='Source storage directory')
+    list_parser.add_argument('--substring', default='.ca/fr', help='URL substring to match')
+    list_parser.add_argument('--output', default='pruned_files.txt',
+                             help='File receiving the matching html/metadata paths')
+
+    args = parser.parse_args()
+
+    if args.command == 'copy':
+        pruned_files = prune(args.src, args.dest, args.substring, workers=args.workers)
+        _write_lines(args.output, pruned_files)
+        print(f"Pruned files list written to {args.output}")
+        print(f"Done. Copied files with substring '{args.substring}' from {args.src} to {args.dest}.")
+        print(f"Source metadata files: {len(_metadata_files(args.src))}")
+        print(f"Destination metadata files: {len(_metadata_files(args.dest))}")
+    else:
+        paths = list_matching(args.src, args.substring, workers=args.workers)
+        _write_lines(args.output, paths)
+        print(f"Done. {len(paths) // 2} pairs written to {args.output}")
@@ -6,25 +6,105 @@ across both database and disk storage modes.
 """
 import sys
 import os
+import atexit
+import time
 import argparse
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to the path so we can import louis
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from louis.db import (
-    get_storage_mode, list_stored_items, load_from_disk, 
+    get_storage_mode, list_stored_items, load_metadata_from_disk, 
     connect_db, cursor, get_storage_directory
 )
 
+# Connection shared by every database operation in this process
+_connection = None
+
+# Upper bound on the number of search results shown per storage
+MAX_SEARCH_RESULTS = 1000
+
 
 def format_timestamp(timestamp):
     """Format a Unix timestamp for display."""
     if timestamp:
-        return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
     return 'N/A'
 
 
+def _get_connection():
+    """Return the shared database connection, connecting on first use.
+    
+    Callers run each operation in connection.transaction() so the
+    connection is left idle, not mid-transaction, between operations.
+    """
+    global _connection
+    if _connection is None or _connection.closed:
+        if _connection is None:
+            atexit.register(_close_connection)
+        _connection = connect_db()
+    return _connection
+
+
+def _close_connection():
+    """Close the shared database connection if one was opened."""
+    if _connection is not None and not _connection.closed:
+        _connection.close()
+
+
+def _positive_int(value):
+    """argparse type for a strictly positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value!r}")
+    return number
+
+
+def _sum_sizes(entries):
+    """Sum the sizes of a sequence of os.DirEntry objects."""
+    return sum(entry.stat().st_size for entry in entries)
+
+
+def scan_directory(directory, suffix, workers=8, parallel_threshold=10000):
+    """Count the files ending with suffix in directory and sum their sizes.
+    
+    Uses a single os.scandir pass so each file costs one stat call, and
+    sizes are summed as entries stream in. Only once parallel_threshold
+    matching files have been seen are the remaining entries collected,
+    split into shards and their stat calls overlapped on a thread pool.
+    """
+    count = 0
+    total_size = 0
+    remaining = None
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not (entry.name.endswith(suffix) and entry.is_file()):
+                    continue
+                if remaining is not None:
+                    remaining.append(entry)
+                    continue
+                count += 1
+                total_size += entry.stat().st_size
+                if count >= parallel_threshold:
+                    # Large directory: leave the rest to the thread pool
+                    remaining = []
+    except FileNotFoundError:
+        return 0, 0
+    
+    if not remaining:
+        return count, total_size
+    
+    shards = [remaining[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        total_size += sum(executor.map(_sum_sizes, shards))
+    return count + len(remaining), total_size
+
+
 def list_items():
     """List all stored items."""
     storage_mode = get_storage_mode()
@@ -36,13 +116,14 @@ def list_items():
         items = list_stored_items()
         if items:
             for item in items[:10]:  # Show first 10 items
-                print(f"  UUID: {item['id']}")
-                print(f"  URL:  {item['url']}")
-                print(f"  Title: {item.get('title', 'N/A')}")
-                print(f"  Lang: {item.get('lang', 'N/A')}")
-                print(f"  Crawled: {format_timestamp(item.get('last_crawled'))}")
-                print(f"  Files: {item.get('html_file')}, {item.get('metadata_file')}")
-                print()
+                print(
+                    f"  UUID: {item['id']}\n"
+                    f"  URL:  {item['url']}\n"
+                    f"  Title: {item.get('title', 'N/A')}\n"
+                    f"  Lang: {item.get('lang', 'N/A')}\n"
+                    f"  Crawled: {format_timestamp(item.get('last_crawled'))}\n"
+                    f"  Files: {item.get('html_file')}, {item.get('metadata_file')}\n"
+                )
             if len(items) > 10:
                 print(f"  ... and {len(items) - 10} more items")
         else:
@@ -52,8 +133,8 @@ def list_items():
     if storage_mode in ['database', 'both']:
         print("🗄️  Database Storage:")
         try:
-            connection = connect_db()
-            with cursor(connection) as cur:
+            connection = _get_connection()
+            with connection.transaction(), cursor(connection) as cur:
                 cur.execute("""
                     SELECT id, url, title, lang, last_crawled, created_at
                     FROM crawl_items 
@@ -64,37 +145,48 @@ def list_items():
                 
                 if items:
                     for item in items:
-                        print(f"  UUID: {item['id']}")
-                        print(f"  URL:  {item['url']}")
-                        print(f"  Title: {item.get('title', 'N/A')}")
-                        print(f"  Lang: {item.get('lang', 'N/A')}")
-                        print(f"  Crawled: {format_timestamp(item.get('last_crawled'))}")
-                        print()
+                        print(
+                            f"  UUID: {item['id']}\n"
+                            f"  URL:  {item['url']}\n"
+                            f"  Title: {item.get('title', 'N/A')}\n"
+                            f"  Lang: {item.get('lang', 'N/A')}\n"
+                            f"  Crawled: {format_timestamp(item.get('last_crawled'))}\n"
+                        )
                 else:
                     print("  No items found in database")
-            connection.close()
         except Exception as e:
             print(f"  Error accessing database: {e}")
 
 
-def search_items(query):
-    """Search for items by URL or title."""
+def search_items(query, limit=10):
+    """Search for items by URL or title, showing at most limit matches per store."""
     storage_mode = get_storage_mode()
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
     print(f"Searching for: '{query}'")
     print("-" * 80)
     
     if storage_mode in ['disk', 'both']:
         print("📁 Disk Storage Results:")
         items = list_stored_items()
-        found = False
+        found = 0
+        query_cf = query.casefold()
         for item in items:
-            if (query.lower() in item.get('url', '').lower() or 
-                query.lower() in item.get('title', '').lower()):
-                print(f"  UUID: {item['id']}")
-                print(f"  URL:  {item['url']}")
-                print(f"  Title: {item.get('title', 'N/A')}")
-                print()
-                found = True
+            # Indexes written before url_cf/title_cf existed are folded here
+            url_cf = item.get('url_cf')
+            if url_cf is None:
+                url_cf = (item.get('url') or '').casefold()
+            title_cf = item.get('title_cf')
+            if title_cf is None:
+                title_cf = (item.get('title') or '').casefold()
+            if query_cf in url_cf or query_cf in title_cf:
+                print(
+                    f"  UUID: {item['id']}\n"
+                    f"  URL:  {item['url']}\n"
+                    f"  Title: {item.get('title', 'N/A')}\n"
+                )
+                found += 1
+                if found >= limit:
+                    break
         if not found:
             print("  No matching items found on disk")
         print()
@@ -102,74 +194,98 @@ def search_items(query):
     if storage_mode in ['database', 'both']:
         print("🗄️  Database Results:")
         try:
-            connection = connect_db()
-            with cursor(connection) as cur:
+            connection = _get_connection()
+            # Named cursor: rows are streamed from the server in batches
+            # of itersize and printed as they arrive
+            with connection.transaction(), \
+                    cursor(connection, name='search_items') as cur:
+                cur.itersize = 100
                 cur.execute("""
                     SELECT id, url, title, lang, last_crawled
                     FROM crawl_items 
                     WHERE url ILIKE %s OR title ILIKE %s
                     ORDER BY last_crawled DESC
-                """, (f'%{query}%', f'%{query}%'))
-                items = cur.fetchall()
+                    LIMIT %s
+                """, (f'%{query}%', f'%{query}%', limit))
                 
-                if items:
-                    for item in items:
-                        print(f"  UUID: {item['id']}")
-                        print(f"  URL:  {item['url']}")
-                        print(f"  Title: {item.get('title', 'N/A')}")
-                        print()
-                else:
+                found = False
+                for item in cur:
+                    print(
+                        f"  UUID: {item['id']}\n"
+                        f"  URL:  {item['url']}\n"
+                        f"  Title: {item.get('title', 'N/A')}\n"
+                    )
+                    found = True
+                if not found:
                     print("  No matching items found in database")
-            connection.close()
         except Exception as e:
             print(f"  Error searching database: {e}")
 
 
+def _show_disk_item(uuid_str):
+    """Print an item stored on disk, returning False if it is not there."""
+    item = load_metadata_from_disk(uuid_str)
+    if not item:
+        return False
+    print(f"Found item on disk:")
+    print(
+        f"  UUID: {item['id']}\n"
+        f"  URL:  {item['url']}\n"
+        f"  Title: {item.get('title', 'N/A')}\n"
+        f"  Lang: {item.get('lang', 'N/A')}\n"
+        f"  Crawled: {format_timestamp(item.get('last_crawled'))}\n"
+        f"  HTML Length: {item['html_size']} bytes\n"
+        f"  Files: {item.get('html_file_path')}\n"
+        f"         {item.get('metadata_file_path')}"
+    )
+    return True
+
+
 def view_item(uuid_str):
     """View a specific item by UUID."""
     storage_mode = get_storage_mode()
     
     if storage_mode in ['disk', 'both']:
         print("📁 Checking disk storage...")
-        item = load_from_disk(uuid_str)
-        if item:
-            print(f"Found item on disk:")
-            print(f"  UUID: {item['id']}")
-            print(f"  URL:  {item['url']}")
-            print(f"  Title: {item.get('title', 'N/A')}")
-            print(f"  Lang: {item.get('lang', 'N/A')}")
-            print(f"  Crawled: {format_timestamp(item.get('last_crawled'))}")
-            print(f"  HTML Length: {len(item.get('html_content', ''))} characters")
-            print(f"  Files: {item.get('html_file_path')}")
-            print(f"         {item.get('metadata_file_path')}")
+        if _show_disk_item(uuid_str):
             return
     
     if storage_mode in ['database', 'both']:
         print("🗄️  Checking database...")
         try:
-            connection = connect_db()
-            with cursor(connection) as cur:
-                cur.execute("SELECT * FROM crawl_items WHERE id = %s", (uuid_str,))
+            connection = _get_connection()
+            with connection.transaction(), cursor(connection) as cur:
+                # Only the size of html_content is shown, so don't fetch it
+                cur.execute("""
+                    SELECT id, url, title, lang, last_crawled,
+                           octet_length(html_content) AS html_len
+                    FROM crawl_items
+                    WHERE id = %s
+                """, (uuid_str,))
                 item = cur.fetchone()
                 
                 if item:
                     print(f"Found item in database:")
-                    print(f"  UUID: {item['id']}")
-                    print(f"  URL:  {item['url']}")
-                    print(f"  Title: {item.get('title', 'N/A')}")
-                    print(f"  Lang: {item.get('lang', 'N/A')}")
-                    print(f"  Crawled: {format_timestamp(item.get('last_crawled'))}")
-                    print(f"  HTML Length: {len(item.get('html_content', ''))} characters")
+                    print(
+                        f"  UUID: {item['id']}\n"
+                        f"  URL:  {item['url']}\n"
+                        f"  Title: {item.get('title', 'N/A')}\n"
+                        f"  Lang: {item.get('lang', 'N/A')}\n"
+                        f"  Crawled: {format_timestamp(item.get('last_crawled'))}\n"
+                        f"  HTML Length: {item['html_len'] or 0} bytes"
+                    )
                     return
-            connection.close()
         except Exception as e:
             print(f"  Error accessing database: {e}")
     
     print(f"Item with UUID '{uuid_str}' not found")
 
 
-def storage_stats():
-    """Show storage statistics."""
+def storage_stats(exact=False):
+    """Show storage statistics.
+    
+    Database row counts are planner estimates unless exact is True.
+    """
     storage_mode = get_storage_mode()
     print(f"Storage mode: {storage_mode}")
     print("-" * 80)
@@ -184,15 +300,15 @@ def storage_stats():
             html_dir = storage_dir / 'html'
             metadata_dir = storage_dir / 'metadata'
             
-            html_files = list(html_dir.glob('*.html')) if html_dir.exists() else []
-            json_files = list(metadata_dir.glob('*.json')) if metadata_dir.exists() else []
+            html_count, html_size = scan_directory(html_dir, '.html')
+            json_count, json_size = scan_directory(metadata_dir, '.json')
             
-            print(f"  HTML files: {len(html_files)}")
-            print(f"  JSON files: {len(json_files)}")
+            print(f"  HTML files: {html_count}")
+            print(f"  JSON files: {json_count}")
             print(f"  Storage directory: {storage_dir}")
             
             # Calculate total size
-            total_size = sum(f.stat().st_size for f in html_files + json_files)
+            total_size = html_size + json_size
             print(f"  Total size: {total_size / (1024*1024):.2f} MB")
             
         except Exception as e:
@@ -202,27 +318,39 @@ def storage_stats():
     if storage_mode in ['database', 'both']:
         print("🗄️  Database Statistics:")
         try:
-            connection = connect_db()
-            with cursor(connection) as cur:
-                # Count items in each table
-                cur.execute("SELECT COUNT(*) as count FROM crawl_items")
-                crawl_count = cur.fetchone()['count']
-                
-                cur.execute("SELECT COUNT(*) as count FROM chunk_items")
-                chunk_count = cur.fetchone()['count']
-                
-                cur.execute("SELECT COUNT(*) as count FROM embedding_items")
-                embedding_count = cur.fetchone()['count']
-                
-                cur.execute("SELECT COUNT(*) as count FROM page_links")
-                links_count = cur.fetchone()['count']
+            connection = _get_connection()
+            with connection.transaction(), cursor(connection) as cur:
+                if exact:
+                    # Count items in each table in a single round-trip
+                    cur.execute("""
+                        SELECT
+                            (SELECT COUNT(*) FROM crawl_items) AS crawl_items,
+                            (SELECT COUNT(*) FROM chunk_items) AS chunk_items,
+                            (SELECT COUNT(*) FROM embedding_items) AS embedding_items,
+                            (SELECT COUNT(*) FROM page_links) AS page_links
+                    """)
+                    counts = cur.fetchone()
+                    suffix = ""
+                else:
+                    # Planner statistics kept up to date by ANALYZE/autovacuum,
+                    # read from the catalog without scanning the tables
+                    cur.execute("""
+                        SELECT relname, reltuples::bigint AS count
+                        FROM pg_class
+                        WHERE relkind = 'r'
+                          AND relname IN ('crawl_items', 'chunk_items', 'embedding_items', 'page_links')
+                    """)
+                    counts = {
+                        row['relname']: row['count'] if row['count'] >= 0 else 'unknown'
+                        for row in cur.fetchall()
+                    }
+                    suffix = " (estimated)"
                 
-                print(f"  Crawl items: {crawl_count}")
-                print(f"  Chunk items: {chunk_count}")
-                print(f"  Embedding items: {embedding_count}")
-                print(f"  Page links: {links_count}")
+                print(f"  Crawl items: {counts.get('crawl_items', 'N/A')}{suffix}")
+                print(f"  Chunk items: {counts.get('chunk_items', 'N/A')}{suffix}")
+                print(f"  Embedding items: {counts.get('embedding_items', 'N/A')}{suffix}")
+                print(f"  Page links: {counts.get('page_links', 'N/A')}{suffix}")
                 
-            connection.close()
         except Exception as e:
             print(f"  Error accessing database: {e}")
 
@@ -238,24 +366,28 @@ def main():
     # Search command
     search_parser = subparsers.add_parser('search', help='Search items by URL or title')
     search_parser.add_argument('query', help='Search query')
+    search_parser.add_argument('--limit', type=_positive_int, default=10,
+                               help='Maximum number of results per storage (default: 10, max: 1000)')
     
     # View command
     view_parser = subparsers.add_parser('view', help='View a specific item by UUID')
     view_parser.add_argument('uuid', help='Item UUID')
     
     # Stats command
-    subparsers.add_parser('stats', help='Show storage statistics')
+    stats_parser = subparsers.add_parser('stats', help='Show storage statistics')
+    stats_parser.add_argument('--exact', action='store_true',
+                              help='Count database rows exactly instead of using estimates')
     
     args = parser.parse_args()
     
     if args.command == 'list':
         list_items()
     elif args.command == 'search':
-        search_items(args.query)
+        search_items(args.query, limit=args.limit)
     elif args.command == 'view':
         view_item(args.uuid)
     elif args.command == 'stats':
-        storage_stats()
+        storage_stats(exact=args.exact)
     else:
         parser.print_help()
 
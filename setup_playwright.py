@@ -16,35 +16,37 @@ def run_command(cmd, description):
     logger.info(f"Running: {description}")
     logger.info(f"Command: {' '.join(cmd)}")
     
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    # Forward output line by line as it is produced so the pipe never fills
+    # up and stalls the child; stderr is merged so both streams are drained
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1
+    )
+    for line in process.stdout:
+        line = line.rstrip()
+        if line:
+            logger.info(f"[{description}] {line}")
+    returncode = process.wait()
+    
+    if returncode == 0:
         logger.info(f"Success: {description}")
-        if result.stdout:
-            logger.info(f"Output: {result.stdout}")
         return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Failed: {description}")
-        logger.error(f"Error: {e.stderr}")
-        return False
+    
+    logger.error(f"Failed: {description} (exit code {returncode})")
+    return False
 
 
 def main():
     """Main setup function."""
     logger.info("Setting up Playwright for louis-crawler")
     
-    # Install Playwright browsers
+    # One install call for all browsers: each playwright install takes the
+    # browser registry lock, so separate calls only wait on each other
     commands = [
         (
-            [sys.executable, "-m", "playwright", "install", "chromium"],
-            "Installing Chromium browser"
-        ),
-        (
-            [sys.executable, "-m", "playwright", "install", "firefox"],
-            "Installing Firefox browser"
-        ),
-        (
-            [sys.executable, "-m", "playwright", "install", "webkit"],
-            "Installing WebKit browser"
+            [sys.executable, "-m", "playwright", "install",
+             "chromium", "firefox", "webkit"],
+            "Installing Chromium, Firefox and WebKit browsers"
         ),
         (
             [sys.executable, "-m", "playwright", "install-deps"],
@@ -0,0 +1,28 @@
+import unittest
+
+from louis.bloom import BloomFilter
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives(self):
+        """every added key is reported as present"""
+        bloom = BloomFilter(1000)
+        keys = [f"https://inspection.canada.ca/{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+
+    def test_false_positive_rate(self):
+        """unseen keys are rarely reported present at capacity"""
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"seen-{i}")
+        false_positives = sum(f"unseen-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_add_reports_new_keys(self):
+        """add returns False and does not count a key added twice"""
+        bloom = BloomFilter(10)
+        self.assertTrue(bloom.add(b"key"))
+        self.assertFalse(bloom.add(b"key"))
+        self.assertEqual(len(bloom), 1)
@@ -2,6 +2,7 @@
 
 import os
 import unittest
+from functools import lru_cache
 
 from bs4 import BeautifulSoup
 
@@ -62,9 +63,14 @@ EXPECTED_TOKENS = [
 
 CWD = os.path.dirname(os.path.abspath(__file__))
 
+@lru_cache(maxsize=None)
 def get_html(filename):
-    with open(f"{CWD}/responses/{filename}.html", encoding="UTF-8") as f:
-        return f.read()
+    # Raw bytes: BeautifulSoup detects the encoding itself
+    fd = os.open(f"{CWD}/responses/{filename}.html", os.O_RDONLY)
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
 
 class TestChunking(unittest.TestCase):
     def test_chunking(self):
@@ -1,4 +1,7 @@
+import os
+import tempfile
 import unittest
+from unittest.mock import MagicMock, patch
 
 import louis.crawler.items as items
 
@@ -9,7 +12,12 @@ import louis.db as db
 
 class TestDBLayer(unittest.TestCase):
     def setUp(self):
-        self.connection = db.connect_db()
+        if not db.PSYCOPG_AVAILABLE:
+            self.skipTest("psycopg not available")
+        try:
+            self.connection = db.connect_db()
+        except db.psycopg.OperationalError as e:
+            self.skipTest(f"PostgreSQL not available: {e}")
 
     def tearDown(self):
         self.connection.close()
@@ -52,3 +60,152 @@ class TestDBLayer(unittest.TestCase):
                 ]
             }))
             self.connection.rollback()
+
+
+    def test_store_crawl_items_to_database(self):
+        """bulk store upserts overlapping batches through the staging table"""
+        base = "https://inspection.canada.ca/test-bulk-store/"
+
+        def crawl_item(path, title, last_crawled):
+            return items.CrawlItem({
+                "url": base + path,
+                "title": title,
+                "lang": "en",
+                "html_content": f"<html><body><p>{title}</p></body></html>",
+                "last_crawled": last_crawled,
+                "last_updated": "2024-01-01",
+                "children": [base + path + "/child"],
+            })
+
+        # Everything, including the session's staging table, is rolled back
+        with self.connection.transaction(force_rollback=True):
+            first = db.store_crawl_items_to_database(self.connection, [
+                crawl_item("a", "A1", 1),
+                crawl_item("b", "B1", 2),
+            ])
+            # Overlaps the first batch on b and repeats c within the batch
+            second = db.store_crawl_items_to_database(self.connection, [
+                crawl_item("b", "B2", 3),
+                crawl_item("c", "C1", 4),
+                crawl_item("c", "C2", 5),
+            ])
+            with db.cursor(self.connection) as cursor:
+                cursor.execute("""
+                    SELECT url, title, lang, html_content, last_crawled,
+                           last_updated, children
+                    FROM crawl_items WHERE url LIKE %s ORDER BY url
+                """, (base + "%",))
+                rows = cursor.fetchall()
+                cursor.execute("SELECT count(*) AS staged FROM crawl_items_staging")
+                staged = cursor.fetchone()["staged"]
+
+        self.assertEqual((first, second), (2, 2))
+        self.assertEqual([row["title"] for row in rows], ["A1", "B2", "C2"])
+        self.assertEqual(rows[1], {
+            "url": base + "b",
+            "title": "B2",
+            "lang": "en",
+            "html_content": "<html><body><p>B2</p></body></html>",
+            "last_crawled": 3,
+            "last_updated": "2024-01-01",
+            "children": [base + "b/child"],
+        })
+        self.assertEqual(staged, 0)
+
+
+@unittest.skipUnless(db.PSYCOPG_AVAILABLE, "psycopg not available")
+class TestCreateTables(unittest.TestCase):
+    def test_missing_pg_trgm_privilege(self):
+        """the schema is created without the trigram index if pg_trgm fails"""
+        connection = MagicMock()
+        cursor = connection.cursor.return_value.__enter__.return_value
+
+        def execute(query, *args, **kwargs):
+            if "CREATE EXTENSION" in query:
+                raise db.psycopg.errors.InsufficientPrivilege("permission denied")
+        cursor.execute.side_effect = execute
+
+        db.create_tables(connection)
+
+        queries = [c.args[0] for c in cursor.execute.call_args_list]
+        self.assertTrue(any("CREATE TABLE IF NOT EXISTS page_links" in q for q in queries))
+        self.assertFalse(any("idx_crawl_items_trgm" in q for q in queries))
+        connection.transaction.assert_called_once()
+        connection.commit.assert_called_once()
+
+
+class TestDiskIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {'STORAGE_DIRECTORY': self.tmp.name})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def _store(self, url, last_crawled):
+        return db.store_to_disk(items.CrawlItem({
+            "url": url,
+            "title": "Test Title",
+            "lang": "en",
+            "html_content": "<html><body><p>Test</p></body></html>",
+            "last_crawled": last_crawled,
+            "children": ["https://inspection.canada.ca/child1"],
+        }))
+
+    def test_store_to_disk_appends_to_index(self):
+        """stored items are listed from the index, newest first"""
+        first = self._store("https://inspection.canada.ca/a", 1)
+        second = self._store("https://inspection.canada.ca/b", 2)
+
+        with open(db.get_disk_index_path(), encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 2)
+        listed = db.list_stored_items()
+        self.assertEqual([i['id'] for i in listed], [second['id'], first['id']])
+        self.assertEqual(set(listed[0]),
+                         {*db.DISK_INDEX_FIELDS, 'url_cf', 'title_cf'})
+        self.assertEqual(listed[0]['title_cf'], 'test title')
+
+    def test_missing_index_is_rebuilt(self):
+        """an index is rebuilt from metadata files when it does not exist"""
+        stored = self._store("https://inspection.canada.ca/a", 1)
+        os.remove(db.get_disk_index_path())
+
+        listed = db.list_stored_items()
+
+        self.assertEqual([i['id'] for i in listed], [stored['id']])
+        self.assertTrue(db.get_disk_index_path().exists())
+
+    def test_store_into_legacy_directory(self):
+        """storing into a directory without an index keeps the older items"""
+        for i in range(3):
+            self._store(f"https://inspection.canada.ca/{i}", i)
+        # Stores made before the index existed have metadata files only
+        os.remove(db.get_disk_index_path())
+
+        self._store("https://inspection.canada.ca/new", 3)
+
+        self.assertEqual(len(db.list_stored_items()), 4)
+
+    def test_listing_is_refreshed_after_store(self):
+        """a cached listing is invalidated when the index changes"""
+        self._store("https://inspection.canada.ca/a", 1)
+        self.assertEqual(len(db.list_stored_items()), 1)
+
+        self._store("https://inspection.canada.ca/b", 2)
+
+        self.assertEqual(len(db.list_stored_items()), 2)
+
+    def test_load_metadata_from_disk(self):
+        """metadata is loaded with the HTML size instead of its content"""
+        stored = self._store("https://inspection.canada.ca/a", 1)
+
+        loaded = db.load_metadata_from_disk(stored['id'])
+
+        self.assertEqual(loaded['url'], "https://inspection.canada.ca/a")
+        self.assertNotIn('html_content', loaded)
+        self.assertEqual(loaded['html_size'],
+                         len("<html><body><p>Test</p></body></html>"))
+        self.assertEqual(loaded['html_file_path'], stored['html_file_path'])
+        self.assertIsNone(db.load_metadata_from_disk('missing'))
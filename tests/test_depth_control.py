@@ -1,242 +1,191 @@
-#!/usr/bin/env python3
 """
-Test script to demonstrate depth control and URL tracking functionality.
-This script simulates the spider behavior to show how the features work.
+Tests for the depth control and URL tracking of the goldie_playwright spider.
+
+The tests share no state, so they can run in parallel:
+
+    pytest -n auto tests/test_depth_control.py
 """
 
-import os
-import tempfile
-from unittest.mock import Mock
+from dataclasses import dataclass, field
+from urllib.parse import urljoin
 from louis.crawler.spiders.goldie_playwright import GoldiePlaywrightSpider
 
 
-def create_mock_response(url, depth=0):
-    """Create a mock response for testing."""
-    response = Mock()
-    response.url = url
-    response.meta = {"depth": depth}
-    response.css.return_value.getall.return_value = [
-        "/en/food",
-        "/en/animals",
-        "/en/plants",
-        "https://inspection.canada.ca/en/contact",
-        "#top",  # Should be ignored
-        "mailto:test@test.com",  # Should be ignored
-    ]
-    return response
+@dataclass(frozen=True)
+class FakeResponse:
+    """Minimal stand-in for a Scrapy response, with plain attribute access."""
 
+    url: str
+    meta: dict = field(default_factory=dict)
+    links: tuple = ()
 
-def test_spider_initialization():
-    """Test spider initialization with different parameters."""
-    print("🔧 Testing Spider Initialization")
-    print("=" * 50)
+    def css(self, selector):
+        return FakeSelectorList(self.links)
 
-    # Test default initialization
-    spider1 = GoldiePlaywrightSpider()
-    print(
-        f"✅ Default spider - max_depth: {spider1.max_depth}, file: {spider1.scraped_urls_file}"
+    def urljoin(self, url):
+        return urljoin(self.url, url)
+
+
+@dataclass(frozen=True)
+class FakeSelectorList:
+    values: tuple
+
+    def getall(self):
+        return list(self.values)
+
+
+def create_mock_response(url, depth=0):
+    """Create a fake response for testing."""
+    return FakeResponse(
+        url=url,
+        meta={"depth": depth},
+        links=(
+            "/en/food",
+            "/en/animals",
+            "/en/plants",
+            "https://inspection.canada.ca/en/contact",
+            "#top",  # Should be ignored
+            "mailto:test@test.com",  # Should be ignored
+        ),
     )
 
-    # Test custom initialization
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as tmp:
-        tmp.write("https://example.com/existing\n")
-        tmp_name = tmp.name
 
-    spider2 = GoldiePlaywrightSpider(max_depth=2, scraped_urls_file=tmp_name)
-    print(
-        f"✅ Custom spider - max_depth: {spider2.max_depth}, file: {spider2.scraped_urls_file}"
+# Built once and shared by tests that only read it
+_BASE_RESPONSE = create_mock_response("https://inspection.canada.ca/en", depth=0)
+
+
+def make_spider(tmp_path, **kwargs):
+    """Create a spider whose tracking files all live in tmp_path."""
+    kwargs.setdefault("scraped_urls_file", tmp_path / "scraped_urls.txt")
+    return GoldiePlaywrightSpider(
+        pending_urls_file=tmp_path / "pending_urls.txt",
+        errored_urls_file=tmp_path / "errored_urls.txt",
+        **kwargs,
     )
-    print(f"✅ Loaded {len(spider2.scraped_urls)} existing URLs")
 
-    # Clean up
-    os.unlink(tmp_name)
-    print()
 
+def test_spider_initialization(tmp_path):
+    """The spider defaults to depth 1 and loads an existing URL file."""
+    spider1 = GoldiePlaywrightSpider()
+    assert spider1.max_depth == 1
+    assert spider1.scraped_urls_file
+
+    tmp_name = tmp_path / "scraped_urls.txt"
+    tmp_name.write_bytes(b"https://example.com/existing\n")
 
-def test_url_tracking():
-    """Test URL tracking functionality."""
-    print("📝 Testing URL Tracking")
-    print("=" * 50)
+    spider2 = make_spider(tmp_path, max_depth=2, scraped_urls_file=tmp_name)
+    assert spider2.max_depth == 2
+    assert spider2.scraped_urls_file == tmp_name
+    assert len(spider2.scraped_urls) == 1
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as tmp:
-        tmp_name = tmp.name
 
-    spider = GoldiePlaywrightSpider(max_depth=1, scraped_urls_file=tmp_name)
+def test_url_tracking(tmp_path):
+    """Saved URLs are reported as scraped and reloaded from the file."""
+    tmp_name = tmp_path / "scraped_urls.txt"
+    spider = make_spider(tmp_path, max_depth=1)
 
-    # Test saving URLs
     test_urls = [
         "https://inspection.canada.ca/en",
         "https://inspection.canada.ca/en/food",
         "https://inspection.canada.ca/en/animals",
     ]
-
     for url in test_urls:
         spider._save_scraped_url(url)
-        print(f"✅ Saved: {url}")
 
-    # Test checking if URL is scraped
-    print(f"✅ URL check - already scraped: {spider._is_url_scraped(test_urls[0])}")
-    print(f"✅ URL check - new URL: {spider._is_url_scraped('https://new-url.com')}")
-
-    # Test loading from file
-    spider2 = GoldiePlaywrightSpider(max_depth=1, scraped_urls_file=tmp_name)
-    print(f"✅ New spider loaded {len(spider2.scraped_urls)} URLs from file")
-
-    # Clean up
-    os.unlink(tmp_name)
-    print()
+    assert all(spider._is_url_scraped(url) for url in test_urls)
+    # Scraped URLs are tracked in a Bloom filter, which can report false
+    # positives; this URL is known not to collide at the default size
+    assert not spider._is_url_scraped("https://new-url.com")
 
+    # Writes are buffered until the file is closed
+    spider._close_scraped_urls_file()
+    with open(tmp_name, "r", encoding="utf-8") as f:
+        assert f.read().split() == [
+            GoldiePlaywrightSpider._url_key(url).hex() for url in test_urls
+        ]
 
-def test_depth_control():
-    """Test depth control functionality."""
-    print("📊 Testing Depth Control")
-    print("=" * 50)
+    spider2 = make_spider(tmp_path, max_depth=1)
+    assert len(spider2.scraped_urls) == len(test_urls)
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as tmp:
-        tmp_name = tmp.name
 
-    # Test with different max depths
-    for max_depth in [0, 1, 2]:
-        print(f"\n🔍 Testing max_depth={max_depth}")
-        spider = GoldiePlaywrightSpider(max_depth=max_depth, scraped_urls_file=tmp_name)
+def test_normalization(tmp_path):
+    """Trivial URL variants are tracked as the same page."""
+    normalize = GoldiePlaywrightSpider._normalize
+    assert normalize("https://inspection.canada.ca/en/food/") == (
+        "https://inspection.canada.ca/en/food"
+    )
+    assert normalize("https://inspection.canada.ca/en//food#top") == (
+        "https://inspection.canada.ca/en/food"
+    )
+    assert normalize("https://inspection.canada.ca") == "https://inspection.canada.ca/"
+    assert normalize("https://inspection.canada.ca/en/food/?q=1") == (
+        "https://inspection.canada.ca/en/food?q=1"
+    )
 
-        # Simulate parse method behavior
-        mock_response = create_mock_response("https://inspection.canada.ca/en", depth=0)
+    spider = make_spider(tmp_path)
+    spider._save_scraped_url("https://inspection.canada.ca/en/food")
+    assert spider._is_url_scraped("https://inspection.canada.ca/en/food/")
+    spider._close_scraped_urls_file()
 
-        print(f"   Current depth: {spider._get_request_depth(mock_response)}")
-        print(
-            f"   Should follow links: {spider._get_request_depth(mock_response) < spider.max_depth}"
-        )
 
-        if spider._get_request_depth(mock_response) < spider.max_depth:
-            print(
-                f"   Would extract and follow URLs at depth {spider._get_request_depth(mock_response) + 1}"
-            )
+def test_depth_control(tmp_path):
+    """Links are followed below max_depth and only saved for later at it."""
+    for max_depth in [0, 1, 2]:
+        run_path = tmp_path / str(max_depth)
+        run_path.mkdir()
+        spider = make_spider(run_path, max_depth=max_depth)
+
+        depth = spider._get_request_depth(_BASE_RESPONSE)
+        assert depth == 0
+
+        requests = list(spider.extract_and_follow_urls(_BASE_RESPONSE, depth))
+        if depth < spider.max_depth:
+            # Fragment and mailto links are ignored
+            assert len(requests) == 4
+            assert all(r.meta["depth"] == depth + 1 for r in requests)
         else:
-            print(f"   Would NOT follow links (max depth reached)")
+            assert requests == []
+            assert len(spider.pending_urls) == 4
 
-    # Clean up
-    os.unlink(tmp_name)
-    print()
 
+def test_different_spider_types(tmp_path):
+    """The spider exposes the depth and URL tracking settings."""
+    tmp_name = tmp_path / "scraped_urls.txt"
+    tmp_name.write_bytes(b"https://example.com/existing\n")
 
-def test_different_spider_types():
-    """Test all three spider types with the new features."""
-    print("🕷️  Testing Different Spider Types")
-    print("=" * 50)
+    spider = make_spider(tmp_path, max_depth=1, lazy=True)
 
-    spider_classes = [
-        (GoldiePlaywrightSpider, "Playwright Spider")
-    ]
-
-    for spider_class, name in spider_classes:
-        print(f"\n🔹 Testing {name}")
-        spider = spider_class(max_depth=1)
-        print(f"   ✅ Name: {spider.name}")
-        print(f"   ✅ Max depth: {spider.max_depth}")
-        print(f"   ✅ URL file: {spider.scraped_urls_file}")
-        print(f"   ✅ Scraped URLs loaded: {len(spider.scraped_urls)}")
-
-    print()
-
-
-def test_url_file_format():
-    """Test the URL file format and management."""
-    print("📄 Testing URL File Format")
-    print("=" * 50)
-
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as tmp:
-        # Create a sample URL file
-        sample_urls = [
-            "https://inspection.canada.ca/en",
-            "https://inspection.canada.ca/en/food/imports",
-            "https://inspection.canada.ca/en/animal-health",
-            "https://inspection.canada.ca/en/plants/plant-health",
-        ]
-
-        for url in sample_urls:
-            tmp.write(f"{url}\n")
-        tmp_name = tmp.name
-
-    # Test loading the file
-    spider = GoldiePlaywrightSpider(scraped_urls_file=tmp_name)
-
-    print(f"✅ File format test:")
-    print(f"   File: {tmp_name}")
-    print(f"   URLs in file: {len(sample_urls)}")
-    print(f"   URLs loaded: {len(spider.scraped_urls)}")
-
-    # Show file contents
-    with open(tmp_name, "r") as f:
-        content = f.read().strip()
-        print(f"   File contents preview:")
-        for i, line in enumerate(content.split("\n")[:3]):
-            print(f"     {i + 1}: {line}")
-        if len(content.split("\n")) > 3:
-            print(f"     ... and {len(content.split('\n')) - 3} more lines")
-
-    # Clean up
-    os.unlink(tmp_name)
-    print()
-
-
-def demonstrate_usage():
-    """Demonstrate typical usage scenarios."""
-    print("💡 Usage Demonstrations")
-    print("=" * 50)
-
-    scenarios = [
-        {
-            "name": "Basic crawl with depth 1",
-            "command": "scrapy crawl goldie_playwright -a max_depth=1",
-            "description": "Scrape start page + direct links",
-        },
-        {
-            "name": "Only start pages (depth 0)",
-            "command": "scrapy crawl goldie_playwright -a max_depth=0",
-            "description": "Only scrape start URLs, no link following",
-        },
-        {
-            "name": "Deep crawl with custom file",
-            "command": 'scrapy crawl goldie_smart -a max_depth=2 -a scraped_urls_file="deep_crawl.txt"',
-            "description": "Two levels deep with custom tracking file",
-        },
-        {
-            "name": "Resume previous crawl",
-            "command": "scrapy crawl goldie_playwright -a max_depth=1",
-            "description": "Run same command twice - second run skips scraped URLs",
-        },
-    ]
-
-    for i, scenario in enumerate(scenarios, 1):
-        print(f"\n🔹 Scenario {i}: {scenario['name']}")
-        print(f"   Command: {scenario['command']}")
-        print(f"   Description: {scenario['description']}")
+    assert spider.name == "goldie_playwright"
+    assert spider.max_depth == 1
+    assert spider.scraped_urls_count == 1
+    # The file is only parsed once a URL is checked
+    assert len(spider.scraped_urls) == 0
+    assert spider._is_url_scraped("https://example.com/existing")
+    assert spider.scraped_urls_count == 1
 
-    print()
 
+def test_scraped_urls_count_without_trailing_newline(tmp_path):
+    """The last line is counted even when the file doesn't end in a newline."""
+    tmp_name = tmp_path / "scraped_urls.txt"
+    tmp_name.write_bytes(b"https://example.com/a\nhttps://example.com/b")
 
-def main():
-    """Run all tests and demonstrations."""
-    print("🚀 Depth Control and URL Tracking Test Suite")
-    print("=" * 60)
-    print()
+    spider = make_spider(tmp_path, lazy=True)
 
-    try:
-        test_spider_initialization()
-        test_url_tracking()
-        test_depth_control()
-        test_different_spider_types()
-        test_url_file_format()
-        demonstrate_usage()
+    assert spider.scraped_urls_count == 2
 
-        print("✅ All tests completed successfully!")
-        print("\n📖 For more information, see README_depth_control.md")
 
-    except Exception as e:
-        print(f"❌ Test failed: {e}")
-        raise
+def test_url_file_format(tmp_path):
+    """A file of plain URLs, one per line, is loaded."""
+    sample_urls = [
+        "https://inspection.canada.ca/en",
+        "https://inspection.canada.ca/en/food/imports",
+        "https://inspection.canada.ca/en/animal-health",
+        "https://inspection.canada.ca/en/plants/plant-health",
+    ]
+    tmp_name = tmp_path / "scraped_urls.txt"
+    tmp_name.write_bytes(("\n".join(sample_urls) + "\n").encode("utf-8"))
 
+    spider = make_spider(tmp_path, scraped_urls_file=tmp_name)
 
-if __name__ == "__main__":
-    main()
+    assert len(spider.scraped_urls) == len(sample_urls)
+    assert all(spider._is_url_scraped(url) for url in sample_urls)
@@ -1,4 +1,5 @@
 import unittest
+from functools import lru_cache
 
 from scrapy import Request
 from bs4 import BeautifulSoup
@@ -12,14 +13,18 @@ import os
 cwd = os.path.dirname(os.path.abspath(__file__))
 
 
+# Responses are only read by the tests, so each fixture is loaded once
+@lru_cache(maxsize=32)
 def get_response(url):
     filename = url.split("/")[-1]
     return fake_response_from_file(f"{cwd}/responses/{filename}.html", url=url)
 
 
 class TestGoldie(unittest.TestCase):
-    def setUp(self):
-        self.spider = GoldieSpider()
+    @classmethod
+    def setUpClass(cls):
+        # GoldieSpider.parse keeps no state, so one spider serves every test
+        cls.spider = GoldieSpider()
 
     def _test_item_results(self, results, expected_length):
         returned_results = []
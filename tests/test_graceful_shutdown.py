@@ -4,33 +4,50 @@ Test script to demonstrate graceful shutdown functionality.
 Run this and press Ctrl+C to test graceful shutdown.
 """
 
-import subprocess
-import time
-import signal
-import sys
+import inspect
+import os
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+from louis.crawler.spiders.goldie_playwright_parallel import (
+    GoldiePlaywrightParallelSpider,
+)
+
 
 def main():
     print("🚀 Starting spider with graceful shutdown capabilities...")
     print("   Press Ctrl+C to test graceful shutdown")
     print("   The spider will handle the signal and stop all workers gracefully")
     print()
-    
+
+    # Run the crawl in this process instead of spawning the scrapy CLI
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "louis.crawler.settings")
+    process = CrawlerProcess(get_project_settings())
+
     try:
-        # Run the spider
-        result = subprocess.run([
-            "scrapy", "crawl", "goldie_playwright_parallel",
-            "-a", "max_depth=2",  # Higher depth for longer running
-            "-a", "num_workers=2", 
-            "-a", "batch_size=3"
-        ], cwd="/home/p4r0d1m3pxz/work/louis-crawler-legacy")
-        
-        print(f"Spider completed with exit code: {result.returncode}")
-        
-    except KeyboardInterrupt:
-        print("\n🛑 Ctrl+C detected! The spider should have handled this gracefully.")
+        # Creating the spider installs its SIGINT/SIGTERM handler, which
+        # finishes the current batch before stopping the crawl
+        process.crawl(
+            GoldiePlaywrightParallelSpider,
+            max_depth=2,  # Higher depth for longer running
+            num_workers=2,
+            batch_size=3,
+        )
+
+        # Scrapy versions that install their own shutdown handlers in start()
+        # accept install_signal_handlers; keep the spider's handler in place
+        if 'install_signal_handlers' in inspect.signature(process.start).parameters:
+            process.start(install_signal_handlers=False)
+        else:
+            process.start()
+
+        print("Spider completed")
         print("   Check the logs above for graceful shutdown messages.")
+
     except Exception as e:
         print(f"Error: {e}")
 
+
 if __name__ == "__main__":
-    main() 
+    main()
@@ -5,163 +5,149 @@ Tests the DiskPipeline and S3Pipeline classes to ensure they handle
 items correctly and provide appropriate fallback behavior.
 """
 
-import unittest
-from unittest.mock import Mock, patch, MagicMock
-import tempfile
-import os
-import shutil
+from unittest.mock import DEFAULT, Mock, patch, MagicMock
+
+import pytest
 
 from louis.crawler.pipelines import LouisPipeline, DiskPipeline, S3Pipeline
 from louis.crawler.items import CrawlItem
 
 
-class TestDiskPipeline(unittest.TestCase):
+@pytest.fixture(scope="class")
+def _db_patches():
+    """Patch the louis.db functions the pipelines call, once per class.
+    
+    Classes apply it to every test through usefixtures("db_mocks"), so no
+    test runs with the real functions after another has patched them.
+    """
+    with patch.multiple('louis.db',
+                        connect_db=DEFAULT,
+                        get_storage_mode=DEFAULT,
+                        store_crawl_items_to_database=DEFAULT,
+                        store_crawl_item_to_database=DEFAULT,
+                        store_to_disk=DEFAULT,
+                        store_to_s3=DEFAULT,
+                        get_s3_config=DEFAULT,
+                        get_s3_client=DEFAULT) as mocks:
+        yield mocks
+
+
+@pytest.fixture
+def db_mocks(_db_patches):
+    """The class-wide louis.db mocks, reset after each test."""
+    yield _db_patches
+    for mock in _db_patches.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.mark.usefixtures("db_mocks")
+class TestDiskPipeline:
     """Test the DiskPipeline class."""
 
-    def setUp(self):
+    def setup_method(self):
         """Set up test environment."""
         self.pipeline = DiskPipeline()
-        self.mock_spider = Mock()
-        self.mock_spider.name = "goldie"
-        
-        # Create a sample CrawlItem
-        self.sample_item = CrawlItem()
-        self.sample_item['url'] = 'https://example.com/test'
-        self.sample_item['title'] = 'Test Title'
-        self.sample_item['lang'] = 'en'
-        self.sample_item['html_content'] = '<html><body><p>Test content</p></body></html>'
-        self.sample_item['last_crawled'] = '2024-01-01T12:00:00'
-        self.sample_item['last_updated'] = '2024-01-01T12:00:00'
-
-    def test_open_spider(self):
+
+    def test_open_spider(self, mock_spider):
         """Test pipeline initialization."""
         # Should not raise any errors
-        self.pipeline.open_spider(self.mock_spider)
+        self.pipeline.open_spider(mock_spider)
 
-    def test_close_spider(self):
+    def test_close_spider(self, mock_spider):
         """Test pipeline cleanup."""
         # Should not raise any errors
-        self.pipeline.close_spider(self.mock_spider)
+        self.pipeline.close_spider(mock_spider)
 
-    @patch('louis.db.store_to_disk')
-    def test_process_goldie_item_success(self, mock_store):
+    def test_process_goldie_item_success(self, db_mocks, sample_item, mock_spider):
         """Test successful processing of goldie spider item."""
+        mock_store = db_mocks['store_to_disk']
         # Mock successful storage
         mock_store.return_value = {
             'id': 'test-uuid',
-            'url': self.sample_item['url'],
-            'title': self.sample_item['title']
+            'url': sample_item['url'],
+            'title': sample_item['title']
         }
         
-        result = self.pipeline.process_item(self.sample_item, self.mock_spider)
+        result = self.pipeline.process_item(sample_item, mock_spider)
         
         # Verify store_to_disk was called
-        mock_store.assert_called_once_with(self.sample_item)
+        mock_store.assert_called_once_with(sample_item)
         
         # Verify result
-        self.assertEqual(result['id'], 'test-uuid')
-        self.assertEqual(result['url'], self.sample_item['url'])
+        assert result['id'] == 'test-uuid'
+        assert result['url'] == sample_item['url']
 
-    @patch('louis.db.store_to_disk')
-    def test_process_goldie_item_failure(self, mock_store):
+    def test_process_goldie_item_failure(self, db_mocks, sample_item, mock_spider):
         """Test handling of storage failure for goldie spider item."""
+        mock_store = db_mocks['store_to_disk']
         # Mock storage failure
         mock_store.side_effect = Exception("Storage failed")
         
-        result = self.pipeline.process_item(self.sample_item, self.mock_spider)
+        result = self.pipeline.process_item(sample_item, mock_spider)
         
         # Should return original item on failure
-        self.assertEqual(result, self.sample_item)
+        assert result == sample_item
 
-    def test_process_unsupported_spider(self):
+    def test_process_unsupported_spider(self, sample_item, mock_spider):
         """Test processing item from unsupported spider."""
-        self.mock_spider.name = "hawn"
+        mock_spider.name = "hawn"
         
-        result = self.pipeline.process_item(self.sample_item, self.mock_spider)
+        result = self.pipeline.process_item(sample_item, mock_spider)
         
         # Should return original item unchanged
-        self.assertEqual(result, self.sample_item)
+        assert result == sample_item
 
 
-class TestS3Pipeline(unittest.TestCase):
+@pytest.mark.usefixtures("db_mocks")
+class TestS3Pipeline:
     """Test the S3Pipeline class."""
 
-    def setUp(self):
+    def setup_method(self):
         """Set up test environment."""
         self.pipeline = S3Pipeline()
-        self.mock_spider = Mock()
-        self.mock_spider.name = "goldie"
-        
-        # Create a sample CrawlItem
-        self.sample_item = CrawlItem()
-        self.sample_item['url'] = 'https://example.com/test'
-        self.sample_item['title'] = 'Test Title'
-        self.sample_item['lang'] = 'en'
-        self.sample_item['html_content'] = '<html><body><p>Test content</p></body></html>'
-        self.sample_item['last_crawled'] = '2024-01-01T12:00:00'
-        self.sample_item['last_updated'] = '2024-01-01T12:00:00'
-
-    @patch('louis.db.get_s3_config')
-    @patch('louis.db.get_s3_client')
-    def test_open_spider_s3_available(self, mock_get_client, mock_get_config):
-        """Test pipeline initialization when S3 is available."""
-        # Mock S3 being available
-        mock_get_config.return_value = {'bucket_name': 'test-bucket'}
-        mock_get_client.return_value = MagicMock()
-        
-        self.pipeline.open_spider(self.mock_spider)
-        
-        self.assertTrue(self.pipeline.s3_available)
-
-    @patch('louis.db.get_s3_config')
-    @patch('louis.db.get_s3_client')
-    def test_open_spider_s3_unavailable(self, mock_get_client, mock_get_config):
-        """Test pipeline initialization when S3 is unavailable."""
-        # Mock S3 being unavailable
-        mock_get_config.return_value = None
-        mock_get_client.return_value = None
-        
-        self.pipeline.open_spider(self.mock_spider)
-        
-        self.assertFalse(self.pipeline.s3_available)
-
-    @patch('louis.db.get_s3_config')
-    @patch('louis.db.get_s3_client')
-    def test_open_spider_s3_error(self, mock_get_client, mock_get_config):
-        """Test pipeline initialization when S3 configuration fails."""
-        # Mock S3 configuration error
-        mock_get_config.side_effect = Exception("S3 config error")
-        
-        self.pipeline.open_spider(self.mock_spider)
-        
-        self.assertFalse(self.pipeline.s3_available)
 
-    @patch('louis.db.store_to_s3')
-    def test_process_goldie_item_s3_success(self, mock_store_s3):
+    @pytest.mark.parametrize("cfg_return,cfg_side,client,expected", [
+        ({'bucket_name': 'test-bucket'}, None, MagicMock(), True),  # available
+        (None, None, None, False),  # unavailable
+        (None, Exception("S3 config error"), MagicMock(), False),  # config error
+    ], ids=["available", "unavailable", "error"])
+    def test_open_spider_s3(self, db_mocks, mock_spider,
+                            cfg_return, cfg_side, client, expected):
+        """Test pipeline initialization for each S3 configuration outcome."""
+        db_mocks['get_s3_config'].return_value = cfg_return
+        db_mocks['get_s3_config'].side_effect = cfg_side
+        db_mocks['get_s3_client'].return_value = client
+        
+        self.pipeline.open_spider(mock_spider)
+        
+        assert self.pipeline.s3_available is expected
+
+    def test_process_goldie_item_s3_success(self, db_mocks, sample_item, mock_spider):
         """Test successful S3 storage of goldie spider item."""
+        mock_store_s3 = db_mocks['store_to_s3']
         # Set S3 as available
         self.pipeline.s3_available = True
         
         # Mock successful S3 storage
         mock_store_s3.return_value = {
             'id': 'test-uuid',
-            'url': self.sample_item['url'],
+            'url': sample_item['url'],
             'bucket_name': 'test-bucket'
         }
         
-        result = self.pipeline.process_item(self.sample_item, self.mock_spider)
+        result = self.pipeline.process_item(sample_item, mock_spider)
         
         # Verify store_to_s3 was called
-        mock_store_s3.assert_called_once_with(self.sample_item)
+        mock_store_s3.assert_called_once_with(sample_item)
         
         # Verify result
-        self.assertEqual(result['id'], 'test-uuid')
-        self.assertEqual(result['bucket_name'], 'test-bucket')
+        assert result['id'] == 'test-uuid'
+        assert result['bucket_name'] == 'test-bucket'
 
-    @patch('louis.db.store_to_disk')
-    @patch('louis.db.store_to_s3')
-    def test_process_goldie_item_s3_fallback(self, mock_store_s3, mock_store_disk):
+    def test_process_goldie_item_s3_fallback(self, db_mocks, sample_item, mock_spider):
         """Test S3 storage with disk fallback."""
+        mock_store_s3 = db_mocks['store_to_s3']
+        mock_store_disk = db_mocks['store_to_disk']
         # Set S3 as available
         self.pipeline.s3_available = True
         
@@ -169,92 +155,144 @@ class TestS3Pipeline(unittest.TestCase):
         mock_store_s3.side_effect = Exception("S3 failed")
         mock_store_disk.return_value = {
             'id': 'test-uuid',
-            'url': self.sample_item['url']
+            'url': sample_item['url']
         }
         
-        result = self.pipeline.process_item(self.sample_item, self.mock_spider)
+        result = self.pipeline.process_item(sample_item, mock_spider)
         
         # Verify both storage methods were called
-        mock_store_s3.assert_called_once_with(self.sample_item)
-        mock_store_disk.assert_called_once_with(self.sample_item)
+        mock_store_s3.assert_called_once_with(sample_item)
+        mock_store_disk.assert_called_once_with(sample_item)
         
         # Verify result from disk storage
-        self.assertEqual(result['id'], 'test-uuid')
+        assert result['id'] == 'test-uuid'
 
-    @patch('louis.db.store_to_disk')
-    def test_process_goldie_item_s3_unavailable(self, mock_store_disk):
+    def test_process_goldie_item_s3_unavailable(self, db_mocks, sample_item, mock_spider):
         """Test processing when S3 is unavailable."""
+        mock_store_disk = db_mocks['store_to_disk']
         # Set S3 as unavailable
         self.pipeline.s3_available = False
         
         # Mock disk storage success
         mock_store_disk.return_value = {
             'id': 'test-uuid',
-            'url': self.sample_item['url']
+            'url': sample_item['url']
         }
         
-        result = self.pipeline.process_item(self.sample_item, self.mock_spider)
+        result = self.pipeline.process_item(sample_item, mock_spider)
         
         # Verify only disk storage was called
-        mock_store_disk.assert_called_once_with(self.sample_item)
+        mock_store_disk.assert_called_once_with(sample_item)
         
         # Verify result
-        self.assertEqual(result['id'], 'test-uuid')
+        assert result['id'] == 'test-uuid'
 
-    def test_process_unsupported_spider(self):
+    def test_process_unsupported_spider(self, sample_item, mock_spider):
         """Test processing item from unsupported spider."""
-        self.mock_spider.name = "kurt"
+        mock_spider.name = "kurt"
         
-        result = self.pipeline.process_item(self.sample_item, self.mock_spider)
+        result = self.pipeline.process_item(sample_item, mock_spider)
         
         # Should return original item unchanged
-        self.assertEqual(result, self.sample_item)
+        assert result == sample_item
 
 
-class TestLouisPipeline(unittest.TestCase):
+@pytest.mark.usefixtures("db_mocks")
+class TestLouisPipeline:
     """Test the original LouisPipeline class for regression."""
 
-    def setUp(self):
+    def setup_method(self):
         """Set up test environment."""
         self.pipeline = LouisPipeline()
-        self.mock_spider = Mock()
-        self.mock_spider.name = "goldie"
 
-    @patch('louis.db.connect_db')
-    def test_open_spider_success(self, mock_connect):
+    def test_open_spider_success(self, db_mocks, mock_spider):
         """Test successful database connection."""
+        mock_connect = db_mocks['connect_db']
         mock_connection = Mock()
         mock_connect.return_value = mock_connection
         
-        self.pipeline.open_spider(self.mock_spider)
+        self.pipeline.open_spider(mock_spider)
         
-        self.assertEqual(self.pipeline.connection, mock_connection)
+        assert self.pipeline.connection == mock_connection
 
-    @patch('louis.db.connect_db')
-    def test_open_spider_failure(self, mock_connect):
+    def test_open_spider_failure(self, db_mocks, mock_spider):
         """Test handling of database connection failure."""
+        mock_connect = db_mocks['connect_db']
         mock_connect.side_effect = Exception("Connection failed")
         
-        self.pipeline.open_spider(self.mock_spider)
+        self.pipeline.open_spider(mock_spider)
         
-        self.assertIsNone(self.pipeline.connection)
+        assert self.pipeline.connection is None
 
-    def test_close_spider_with_connection(self):
+    def test_close_spider_with_connection(self, mock_spider):
         """Test closing spider with active database connection."""
         mock_connection = Mock()
         self.pipeline.connection = mock_connection
         
-        self.pipeline.close_spider(self.mock_spider)
+        self.pipeline.close_spider(mock_spider)
         
         mock_connection.close.assert_called_once()
 
-    def test_close_spider_without_connection(self):
+    def test_close_spider_without_connection(self, mock_spider):
         """Test closing spider without database connection."""
         self.pipeline.connection = None
         
         # Should not raise any errors
-        self.pipeline.close_spider(self.mock_spider)
+        self.pipeline.close_spider(mock_spider)
+
+    def test_process_item_buffers_until_close(self, db_mocks, mock_spider):
+        """Test crawl items are buffered and bulk stored on close."""
+        mock_mode = db_mocks['get_storage_mode']
+        mock_bulk = db_mocks['store_crawl_items_to_database']
+        mock_mode.return_value = 'database'
+        mock_bulk.return_value = 2
+        self.pipeline.connection = Mock()
+        items = [CrawlItem(url='https://example.com/a'),
+                 CrawlItem(url='https://example.com/b')]
+
+        for item in items:
+            assert self.pipeline.process_item(item, mock_spider) == item
+        mock_bulk.assert_not_called()
+
+        self.pipeline.close_spider(mock_spider)
+
+        mock_bulk.assert_called_once_with(self.pipeline.connection, items)
+
+    def test_flush_falls_back_to_disk(self, db_mocks, mock_spider):
+        """Test an item that fails the bulk and single inserts goes to disk."""
+        mock_mode = db_mocks['get_storage_mode']
+        mock_bulk = db_mocks['store_crawl_items_to_database']
+        mock_single = db_mocks['store_crawl_item_to_database']
+        mock_disk = db_mocks['store_to_disk']
+        mock_mode.return_value = 'database'
+        mock_bulk.side_effect = Exception("COPY failed")
+        mock_single.side_effect = Exception("INSERT failed")
+        self.pipeline.connection = MagicMock()
+        self.pipeline.batch_size = 1
+        item = CrawlItem(url='https://example.com/a')
+
+        self.pipeline.process_item(item, mock_spider)
+
+        mock_disk.assert_called_once_with(item)
+        assert self.pipeline.crawl_items == []
+
+    def test_flush_retries_batch_with_one_bad_row(self, db_mocks):
+        """Test a failed bulk insert only sends the bad row to disk."""
+        mock_bulk = db_mocks['store_crawl_items_to_database']
+        mock_single = db_mocks['store_crawl_item_to_database']
+        mock_disk = db_mocks['store_to_disk']
+        mock_bulk.side_effect = Exception("COPY failed")
+        mock_single.side_effect = [None, Exception("bad row"), None]
+        self.pipeline.connection = MagicMock()
+        items = [CrawlItem(url=f'https://example.com/{n}') for n in 'abc']
+        self.pipeline.crawl_items = list(items)
+
+        self.pipeline.flush_crawl_items()
+
+        assert [c.args[1] for c in mock_single.call_args_list] == items
+        assert self.pipeline.connection.transaction.call_count == 3
+        mock_disk.assert_called_once_with(items[1])
 
 
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    pytest.main([__file__]) 
\ No newline at end of file
@@ -5,101 +5,85 @@ Test script to validate Playwright setup with the Louis crawler.
 import asyncio
 import sys
 import logging
-from playwright.async_api import async_playwright
+
+import pytest
+
+# Skip the module at collection time when Playwright is not installed
+playwright = pytest.importorskip('playwright')
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def test_playwright_basic():
+@pytest.mark.network
+@pytest.mark.asyncio(loop_scope="session")
+async def test_playwright_basic(page):
     """Test basic Playwright functionality."""
     logger.info("Testing basic Playwright functionality...")
     
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
-            # Test with a simple page
-            await page.goto('https://httpbin.org/html')
-            title = await page.title()
-            
-            logger.info(f"Successfully loaded page with title: {title}")
-            
-            # Test JavaScript execution
-            result = await page.evaluate('() => document.title')
-            logger.info(f"JavaScript execution test: {result}")
-            
-            await browser.close()
-            logger.info("✅ Basic Playwright test passed")
-            return True
-            
-    except Exception as e:
-        logger.error(f"❌ Basic Playwright test failed: {e}")
-        return False
+    # Test with a simple page
+    await page.goto('https://httpbin.org/html')
+    title = await page.title()
+    
+    logger.info(f"Successfully loaded page with title: {title}")
+    
+    # Test JavaScript execution
+    result = await page.evaluate('() => document.title')
+    logger.info(f"JavaScript execution test: {result}")
+    assert result == title
+    
+    logger.info("✅ Basic Playwright test passed")
 
 
-async def test_government_site():
+@pytest.mark.network
+@pytest.mark.slow
+@pytest.mark.asyncio(loop_scope="session")
+async def test_government_site(page):
     """Test with the actual government site."""
     logger.info("Testing with inspection.canada.ca...")
     
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
-            # Test the actual site
-            await page.goto('https://inspection.canada.ca/en', timeout=30000)
-            await page.wait_for_load_state('networkidle')
-            
-            title = await page.title()
-            content = await page.content()
-            
-            logger.info(f"Site title: {title}")
-            logger.info(f"Content length: {len(content)} characters")
-            
-            # Check for main content
-            main_elements = await page.query_selector_all('main')
-            logger.info(f"Found {len(main_elements)} main elements")
-            
-            await browser.close()
-            logger.info("✅ Government site test passed")
-            return True
-            
-    except Exception as e:
-        logger.error(f"❌ Government site test failed: {e}")
-        return False
+    # Test the actual site
+    await page.goto('https://inspection.canada.ca/en', timeout=30000)
+    # The DOM and <main> are enough for a smoke test; don't wait for networkidle
+    await page.wait_for_load_state('domcontentloaded')
+    await page.wait_for_selector('main', timeout=5000)
+    
+    title = await page.title()
+    content = await page.content()
+    
+    logger.info(f"Site title: {title}")
+    logger.info(f"Content length: {len(content)} characters")
+    assert title
+    
+    # Check for main content
+    main_elements = await page.query_selector_all('main')
+    logger.info(f"Found {len(main_elements)} main elements")
+    assert main_elements
+    
+    logger.info("✅ Government site test passed")
 
 
 def test_imports():
     """Test that all required modules can be imported."""
     logger.info("Testing imports...")
     
+    # Playwright itself was imported (or skipped) at module level
     try:
-        # Test Playwright import
-        import playwright
-        try:
-            from playwright import __version__ as pw_version
-            logger.info(f"✅ Playwright version: {pw_version}")
-        except ImportError:
-            logger.info("✅ Playwright imported successfully (version detection unavailable)")
-        
-        # Test scrapy-playwright import
-        import scrapy_playwright
-        logger.info(f"✅ Scrapy-Playwright imported successfully")
-        
-        # Test our custom modules
-        from louis.crawler.playwright_middleware import PlaywrightMiddleware
-        logger.info("✅ PlaywrightMiddleware imported successfully")
-        
-        from louis.crawler.spiders.base_playwright import PlaywrightSpider, SmartPlaywrightSpider
-        logger.info("✅ Playwright spider classes imported successfully")
-        
-        return True
-        
-    except ImportError as e:
-        logger.error(f"❌ Import test failed: {e}")
-        return False
+        from playwright import __version__ as pw_version
+        logger.info(f"✅ Playwright version: {pw_version}")
+    except ImportError:
+        logger.info("✅ Playwright imported successfully (version detection unavailable)")
+    
+    # Test scrapy-playwright import
+    pytest.importorskip('scrapy_playwright')
+    logger.info("✅ Scrapy-Playwright imported successfully")
+    
+    # Test our custom modules
+    from louis.crawler.playwright_middleware import PlaywrightMiddleware  # noqa: F401
+    logger.info("✅ PlaywrightMiddleware imported successfully")
+    
+    from louis.crawler.spiders.base_playwright import PlaywrightSpider, SmartPlaywrightSpider  # noqa: F401
+    logger.info("✅ Playwright spider classes imported successfully")
 
 
 async def main():
@@ -115,22 +99,32 @@ async def main():
     passed = 0
     total = len(tests)
     
-    for test_name, test_func, is_async in tests:
-        logger.info(f"\n{'='*50}")
-        logger.info(f"Running: {test_name}")
-        logger.info(f"{'='*50}")
-        
-        try:
-            if is_async:
-                result = await test_func()
-            else:
-                result = test_func()
-                
-            if result:
+    from playwright.async_api import async_playwright
+
+    # Launch the browser once and give each async test a fresh context
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        for test_name, test_func, is_async in tests:
+            logger.info(f"\n{'='*50}")
+            logger.info(f"Running: {test_name}")
+            logger.info(f"{'='*50}")
+            
+            try:
+                if is_async:
+                    context = await browser.new_context()
+                    try:
+                        await test_func(await context.new_page())
+                    finally:
+                        await context.close()
+                else:
+                    test_func()
                 passed += 1
-                
-        except Exception as e:
-            logger.error(f"❌ {test_name} failed with exception: {e}")
+                    
+            except pytest.skip.Exception as e:
+                logger.error(f"❌ {test_name} could not run: {e}")
+            except Exception as e:
+                logger.error(f"❌ {test_name} failed with exception: {e}")
+        await browser.close()
     
     logger.info(f"\n{'='*50}")
     logger.info(f"Test Results: {passed}/{total} tests passed")
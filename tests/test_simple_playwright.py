@@ -1,21 +1,44 @@
 #!/usr/bin/env python3
 """
 Simple test for goldie_playwright spider - tests scraping one page only.
+
+Crawls run on pytest-twisted's reactor:
+
+    python -m pytest tests/test_simple_playwright.py -m network --reactor=asyncio
 """
 import sys
 import os
 sys.path.insert(0, os.path.abspath('.'))
 
+import pytest
+from scrapy.crawler import Crawler
+
 from louis.crawler.spiders.goldie_playwright import GoldiePlaywrightSpider
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
 
-def test_single_page():
+# The crawl needs the reactor that pytest-twisted runs for the session
+pytest_twisted = pytest.importorskip('pytest_twisted')
+
+
+class _OneShotGoldie(GoldiePlaywrightSpider):
+    """GoldiePlaywrightSpider limited to a single start page.
+
+    Subclassing keeps the test's start URL and settings off the real
+    spider class.
+    """
+    start_urls = ["https://inspection.canada.ca/en"]
+    custom_settings = {
+        'CLOSESPIDER_PAGECOUNT': 1,
+    }
+
+
+@pytest.mark.network
+@pytest.mark.slow
+def test_single_page(scrapy_settings, crawler_runner):
     """Test scraping a single page with goldie_playwright spider."""
     print("🕷️  Testing goldie_playwright spider with single page...")
     
-    # Get project settings
-    settings = get_project_settings()
+    # Copy the shared project settings before overriding them
+    settings = scrapy_settings.copy()
     
     # Override settings for single page test
     settings.update({
@@ -37,29 +60,18 @@ def test_single_page():
         'REQUEST_FINGERPRINTER_IMPLEMENTATION': '2.7',
     })
     
-    # Create spider with custom start URL for testing
-    spider_class = GoldiePlaywrightSpider
-    spider_class.start_urls = ["https://inspection.canada.ca/en"]
-    spider_class.custom_settings = {
-        'CLOSESPIDER_PAGECOUNT': 1,
-    }
-    
-    # Create and run crawler
-    process = CrawlerProcess(settings)
-    process.crawl(spider_class)
+    # Run the crawl on the shared runner with this test's settings
+    crawler = Crawler(_OneShotGoldie, settings)
     
     print("🚀 Starting single page test...")
     print("📄 Target URL: https://inspection.canada.ca/en")
     print("💾 Storage: ./test_storage")
     
-    try:
-        process.start()
-        print("✅ Test completed successfully!")
-    except Exception as e:
-        print(f"❌ Test failed: {e}")
-        return False
+    pytest_twisted.blockon(crawler_runner.crawl(crawler))
     
-    return True
+    assert crawler.stats.get_value('item_scraped_count', 0) >= 1
+    print("✅ Test completed successfully!")
+
 
 if __name__ == "__main__":
-    test_single_page()
+    sys.exit(pytest.main([__file__, "-m", "network", "--reactor=asyncio"]))